@@ -0,0 +1,68 @@
+"""
+Micro-batching decorator for embedding adapters.
+
+Concurrent `embed_query` calls (e.g. API requests served from FastAPI's thread
+pool) are coalesced inside a short window and sent to the wrapped adapter as a
+single `embed_texts` request. The first caller in a window waits `window_ms`
+and then flushes everything that queued up behind it; a caller that fills the
+batch flushes immediately. A lone query pays at most one window of latency.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, List, Tuple
+
+from app.ports import EmbedderPort
+
+
+class MicroBatchingEmbedder(EmbedderPort):
+    """Coalesce concurrent single-query embeddings into batched requests."""
+
+    def __init__(self, inner: EmbedderPort, window_ms: float = 10.0, max_batch: int = 64) -> None:
+        self.inner = inner
+        self.window_s = max(0.0, float(window_ms)) / 1000.0
+        self.max_batch = max(1, int(max_batch))
+        self._lock = threading.Lock()
+        self._pending: List[Tuple[str, Future]] = []
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the wrapped adapter's extras (model_name, embed_array, ...)
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def _flush(self) -> None:
+        with self._lock:
+            batch, self._pending = self._pending, []
+        if not batch:
+            return
+        # Identical in-flight queries share one slot in the request
+        unique = list(dict.fromkeys(text for text, _ in batch))
+        try:
+            vectors = dict(zip(unique, self.inner.embed_texts(unique)))
+        except Exception as exc:
+            for _, fut in batch:
+                fut.set_exception(exc)
+            return
+        for text, fut in batch:
+            fut.set_result(vectors.get(text, []))
+
+    def embed_query(self, text: str) -> List[float]:
+        fut: Future = Future()
+        with self._lock:
+            self._pending.append((text, fut))
+            leader = len(self._pending) == 1
+            full = len(self._pending) >= self.max_batch
+        if full:
+            self._flush()
+        elif leader:
+            time.sleep(self.window_s)
+            self._flush()
+        return fut.result()
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        # Callers with a real batch already amortise the request
+        return self.inner.embed_texts(texts)
@@ -0,0 +1,127 @@
+"""
+Query-embedding cache decorator for embedding adapters.
+
+Repeat questions (popular queries, evaluation reruns) would otherwise pay a
+full embeddings API round-trip every time. `embed_query` results are kept in
+an in-memory LRU and, when `cache_dir` is set, as raw float32 files keyed by
+sha256(model, normalize, text) so they survive across processes. Batch
+`embed_texts` calls pass straight through.
+
+Given a `factory` (plus the model name and normalise flag that key the cache)
+instead of a built adapter, the wrapped adapter is only constructed on the
+first cache miss, so a process answering from the disk cache never imports
+or connects the embedding client.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+
+import numpy as np
+
+from app.ports import EmbedderPort
+
+
+class QueryCachingEmbedder(EmbedderPort):
+    """Memoise single-query embeddings in memory and, optionally, on disk."""
+
+    def __init__(
+        self,
+        inner: Optional[EmbedderPort] = None,
+        max_entries: int = 1024,
+        cache_dir: Optional[str] = None,
+        *,
+        factory: Optional[Callable[[], EmbedderPort]] = None,
+        model_name: Optional[str] = None,
+        normalize: Any = "",
+    ) -> None:
+        if inner is None and factory is None:
+            raise ValueError("QueryCachingEmbedder needs an inner adapter or a factory")
+        self._inner = inner
+        self._factory = factory
+        self.max_entries = max(0, int(max_entries))
+        self.cache_dir = Path(cache_dir).expanduser() if cache_dir else None
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+        if inner is not None:
+            model_name = getattr(inner, "model_name", type(inner).__name__)
+            normalize = getattr(inner, "normalize", "")
+        else:
+            # Lazy: answer these without building the adapter
+            self.model_name = model_name
+            self.normalize = normalize
+        # Vectors depend on the model and on normalisation, not just the text
+        self._namespace = f"{model_name}\0{normalize}\0"
+        self._lock = threading.Lock()
+        self._build_lock = threading.Lock()
+        self._mem: "OrderedDict[str, Tuple[float, ...]]" = OrderedDict()
+
+    @property
+    def inner(self) -> EmbedderPort:
+        if self._inner is None:
+            with self._build_lock:
+                if self._inner is None:
+                    self._inner = self._factory()
+        return self._inner
+
+    def __getattr__(self, name: str) -> Any:
+        # Expose the wrapped adapter's extras (model_name, embed_array, ...)
+        if name in ("inner", "_inner", "_factory"):
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def _key(self, text: str) -> str:
+        return hashlib.sha256((self._namespace + text).encode("utf-8")).hexdigest()
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, ...]]:
+        if self.cache_dir is None:
+            return None
+        try:
+            return tuple(np.fromfile(self.cache_dir / f"{key}.f32", dtype="float32").tolist()) or None
+        except (OSError, ValueError):
+            return None
+
+    def _write_disk(self, key: str, vec: Tuple[float, ...]) -> None:
+        if self.cache_dir is None:
+            return
+        path = self.cache_dir / f"{key}.f32"
+        tmp = path.with_name(f"{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+        try:
+            np.asarray(vec, dtype="float32").tofile(tmp)
+            os.replace(tmp, path)
+        except OSError:
+            pass  # cache is best-effort
+
+    def _remember(self, key: str, vec: Tuple[float, ...]) -> None:
+        if not self.max_entries:
+            return
+        with self._lock:
+            self._mem[key] = vec
+            self._mem.move_to_end(key)
+            while len(self._mem) > self.max_entries:
+                self._mem.popitem(last=False)
+
+    def embed_query(self, text: str) -> List[float]:
+        key = self._key(text)
+        with self._lock:
+            vec = self._mem.get(key)
+            if vec is not None:
+                self._mem.move_to_end(key)
+                return list(vec)
+
+        vec = self._read_disk(key)
+        if vec is None:
+            vec = tuple(self.inner.embed_query(text))
+            if not vec:
+                return []
+            self._write_disk(key, vec)
+        self._remember(key, vec)
+        return list(vec)
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_texts(texts)
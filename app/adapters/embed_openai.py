@@ -77,21 +77,38 @@ class OpenAIEmbeddingAdapter(EmbedderPort):
             return vectors
         norms = np.linalg.norm(vectors, axis=1, keepdims=True)
         norms[norms == 0] = 1.0
-        return vectors / norms
+        return np.divide(vectors, norms, out=vectors)
 
-    def embed_texts(self, texts: List[str]) -> List[List[float]]:
-        vectors: List[List[float]] = []
+    def embed_array(self, texts: Sequence[str]) -> np.ndarray:
+        """Return embeddings as a float32 array of shape (N, D) without a list round-trip.
+
+        Batches are written into one preallocated array, so peak memory is the
+        result plus a single batch rather than every batch plus a concatenated copy.
+        """
+        out: np.ndarray | None = None
+        row = 0
         for batch in self._iter_batches(texts):
             if not batch:
                 continue
-            batch_vecs = self._request_embeddings(batch)
-            vectors.extend(batch_vecs)
-        if not vectors:
+            vecs = np.asarray(self._request_embeddings(batch), dtype="float32")
+            if out is None:
+                if len(vecs) == len(texts):
+                    out = vecs  # single batch: use it as is
+                else:
+                    out = np.empty((len(texts), vecs.shape[1]), dtype="float32")
+            if out is not vecs:
+                out[row : row + len(vecs)] = vecs
+            row += len(vecs)
+        if out is None:
+            return np.empty((0, 0), dtype="float32")
+        return self._maybe_normalize(out[:row])
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        arr = self.embed_array(texts)
+        if not arr.size:
             return []
-        arr = np.asarray(vectors, dtype="float32")
-        arr = self._maybe_normalize(arr)
-        return arr.astype("float32").tolist()
+        return arr.tolist()
 
     def embed_query(self, text: str) -> List[float]:
-        result = self.embed_texts([text])
-        return result[0] if result else []
+        arr = self.embed_array([text])
+        return arr[0].tolist() if arr.size else []
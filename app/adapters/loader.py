@@ -25,6 +25,41 @@ def _coerce_bool(value: Any, default: bool) -> bool:
 
 from app.setting import settings
 
+
+def _maybe_micro_batch(embedder, cfg: Mapping[str, Any]):
+    """Wrap with MicroBatchingEmbedder when `batch_window_ms` > 0 is configured."""
+    try:
+        window_ms = float(cfg.get("batch_window_ms") or 0)
+    except (TypeError, ValueError):
+        window_ms = 0.0
+    if window_ms <= 0:
+        return embedder
+    from app.adapters.embed_batching import MicroBatchingEmbedder
+
+    return MicroBatchingEmbedder(embedder, window_ms=window_ms)
+
+def _maybe_query_cache(build, cfg: Mapping[str, Any], model_name: str, normalize: bool):
+    """
+    Wrap with QueryCachingEmbedder unless `query_cache_size` is 0 and no `query_cache_dir` is set.
+
+    With a disk cache the adapter is built lazily (`build` runs on the first
+    miss), so repeat queries in a fresh process skip the client import/setup.
+    """
+    try:
+        size = int(cfg.get("query_cache_size", 1024))
+    except (TypeError, ValueError):
+        size = 1024
+    cache_dir = cfg.get("query_cache_dir") or None
+    if size <= 0 and not cache_dir:
+        return build()
+    from app.adapters.embed_cache import QueryCachingEmbedder
+
+    if cache_dir:
+        return QueryCachingEmbedder(
+            max_entries=size, cache_dir=cache_dir, factory=build, model_name=model_name, normalize=normalize
+        )
+    return QueryCachingEmbedder(build(), max_entries=size)
+
 def load_embedder(embed_cfg: Mapping[str, Any] | None, env: Mapping[str, str] | None = None):
     """Instantiate an embedding adapter based on config/environment."""
 
@@ -55,19 +90,25 @@ def load_embedder(embed_cfg: Mapping[str, Any] | None, env: Mapping[str, str] |
             retry_backoff = float(retry_backoff)
         except (TypeError, ValueError):
             retry_backoff = 1.5
-        try:
-            from app.adapters.embed_openai import OpenAIEmbeddingAdapter
-        except ImportError as exc:  # pragma: no cover - depends on optional deps
-            raise ImportError(
-                "OpenAI embedding adapter unavailable. Ensure the OpenAI client library is installed."
-            ) from exc
-        return OpenAIEmbeddingAdapter(
-            model_name=model,
-            batch_size=batch_size,
-            normalize=normalize,
-            max_retries=max_retries,
-            retry_backoff=retry_backoff,
-        )
+
+        def build():
+            try:
+                from app.adapters.embed_openai import OpenAIEmbeddingAdapter
+            except ImportError as exc:  # pragma: no cover - depends on optional deps
+                raise ImportError(
+                    "OpenAI embedding adapter unavailable. Ensure the OpenAI client library is installed."
+                ) from exc
+            embedder = OpenAIEmbeddingAdapter(
+                model_name=model,
+                batch_size=batch_size,
+                normalize=normalize,
+                max_retries=max_retries,
+                retry_backoff=retry_backoff,
+            )
+            return _maybe_micro_batch(embedder, cfg)
+
+        # Cache outermost: a hit skips the micro-batch window as well as the request
+        return _maybe_query_cache(build, cfg, model, normalize)
 
     raise ValueError(f"Unknown embedder.adapter: {adapter_name}")
 
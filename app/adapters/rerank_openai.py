@@ -71,19 +71,20 @@ class OpenAIRerankerAdapter(RerankerPort):
                 raise
 
     def _prepare_vectors(self, query: str, candidates: Sequence[dict]) -> tuple[np.ndarray, np.ndarray]:
-        texts = [self._truncate((hit.get("metadata", {}) or {}).get("preview") or (hit.get("metadata", {}) or {}).get("text") or "") for hit in candidates]
+        texts = []
+        for hit in candidates:
+            md = hit.get("metadata") or {}
+            texts.append(self._truncate(md.get("preview") or md.get("text") or ""))
         batch = [query] + texts
         vectors = self._embed_batch(batch)
         q_vec = vectors[0]
         doc_vecs = vectors[1:]
         if self.normalize:
-            def _norm(v: np.ndarray) -> np.ndarray:
-                norms = np.linalg.norm(v, axis=1, keepdims=True)
-                norms[norms == 0] = 1.0
-                return v / norms
-
-            q_vec = _norm(q_vec[np.newaxis, :])[0]
-            doc_vecs = _norm(doc_vecs)
+            # One in-place pass over the freshly decoded (N+1, D) float32 block;
+            # q_vec/doc_vecs are views, so no normalised copies are allocated.
+            norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+            norms[norms == 0] = 1.0
+            np.divide(vectors, norms, out=vectors)
         return q_vec, doc_vecs
 
     def rerank(self, query: str, hits: List[dict]) -> List[dict]:
@@ -115,19 +116,23 @@ class OpenAIRerankerAdapter(RerankerPort):
             f"topn={self.topn} truncate={self.truncate_chars} elapsed={self.last_run_ms:.1f}ms"
         )
 
+        # Order on the score array (stable, descending) rather than sorting
+        # the hit dicts through a per-item key lookup
+        order = np.argsort(-scores, kind="stable").tolist()
+        score_list = scores.tolist()
         reranked: List[dict] = []
-        for hit, score in zip(candidates, scores.tolist()):
+        for idx in order:
+            hit = candidates[idx]
             if "faiss_score" not in hit and "score" in hit:
                 try:
                     hit["faiss_score"] = float(hit["score"])
                 except (TypeError, ValueError):
                     hit["faiss_score"] = hit.get("score")
-            rerank_val = float(score)
+            rerank_val = score_list[idx]
             hit["rerank_score"] = rerank_val
             hit["score"] = rerank_val
             reranked.append(hit)
 
-        reranked.sort(key=lambda item: item.get("rerank_score", item.get("score", 0.0)), reverse=True)
         if tail:
             reranked.extend(tail)
         return reranked
@@ -9,12 +9,43 @@ from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
 from sqlalchemy.pool import QueuePool
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
 logger = logging.getLogger(__name__)
 
 # Regex pattern for valid SQL identifiers (table names, column names)
 # Allows: starts with letter or underscore, followed by letters, numbers, underscores
 VALID_SQL_IDENTIFIER = re.compile(r'^[a-zA-Z_][a-zA-Z0-9_]*$')
 
+# pgvector column types and their cosine operator classes.
+# halfvec stores fp16 (half the size of vector) and, unlike vector, can be
+# HNSW-indexed above 2000 dims, which text-embedding-3-large (3072) needs.
+VECTOR_TYPES = {
+    "vector": "vector_cosine_ops",
+    "halfvec": "halfvec_cosine_ops",
+}
+
+
+def _vector_literal(embedding) -> str:
+    """
+    Render an embedding as a pgvector text literal.
+
+    Embeddings are float32 and pgvector stores float4, so 9 significant digits
+    round-trip every component exactly. str() on the list instead emits the
+    full float64 repr of each value: ~60% more bytes per row, and slower to build.
+    """
+    return "[" + ",".join(map("%.9g".__mod__, embedding)) + "]"
+
+
+def _metadata_json(meta: Dict[str, Any]) -> str:
+    """Serialise chunk metadata for the JSONB column (orjson when available)."""
+    if orjson is not None:
+        return orjson.dumps(meta, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY).decode("utf-8")
+    return json.dumps(meta)
+
 
 def validate_table_name(table_name: str) -> str:
     """
@@ -51,6 +82,11 @@ def validate_table_name(table_name: str) -> str:
     return table_name
 
 
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so keywords are matched literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
 class PostgresStoreAdapter:
     """
     PostgreSQL vector store adapter with pgvector support.
@@ -59,7 +95,12 @@ class PostgresStoreAdapter:
     - Connection pooling for better performance
     - Hybrid search (vector + keyword)
     - Metadata filtering (year, doc_id, contains)
+    - Optional fp16 storage (vector_type="halfvec")
     """
+
+    # year_min/year_max/contains filters are applied inside the ANN query,
+    # so callers can skip re-checking them on the returned hits.
+    supports_prefilter = True
     
     def __init__(
         self, 
@@ -68,9 +109,36 @@ class PostgresStoreAdapter:
         embedder: Any = None,
         pool_size: int = 5,
         max_overflow: int = 10,
+        vector_type: str = "vector",
+        hnsw_m: int = 16,
+        hnsw_ef_construction: int = 64,
+        hnsw_ef_search: Optional[int] = None,
+        hnsw_iterative_scan: Optional[str] = None,
     ):
         # Validate table name to prevent SQL injection
         self.table_name = validate_table_name(table_name)
+
+        vector_type = (vector_type or "vector").lower()
+        if vector_type not in VECTOR_TYPES:
+            raise ValueError(
+                f"Unknown vector_type '{vector_type}'. Expected one of: {', '.join(VECTOR_TYPES)}"
+            )
+        self.vector_type = vector_type
+
+        # HNSW build parameters only apply when the index is first created;
+        # ef_search is set per query (None keeps the server's hnsw.ef_search)
+        self.hnsw_m = int(hnsw_m)
+        self.hnsw_ef_construction = int(hnsw_ef_construction)
+        self.hnsw_ef_search = int(hnsw_ef_search) if hnsw_ef_search else None
+        # pgvector >= 0.8: keep scanning the graph until filtered queries fill
+        # their LIMIT ("relaxed_order" or "strict_order"; None = off)
+        iterative = str(hnsw_iterative_scan).lower() if hnsw_iterative_scan else None
+        if iterative not in (None, "off", "relaxed_order", "strict_order"):
+            raise ValueError(
+                f"Unknown hnsw_iterative_scan '{hnsw_iterative_scan}'. "
+                "Expected one of: off, relaxed_order, strict_order"
+            )
+        self.hnsw_iterative_scan = None if iterative == "off" else iterative
         
         self.connection_string = connection_string or os.environ.get("POSTGRES_CONNECTION_STRING")
         if not self.connection_string:
@@ -89,8 +157,8 @@ class PostgresStoreAdapter:
         )
         self.Session = sessionmaker(bind=self.engine)
         logger.info(
-            "PostgresStoreAdapter initialized: table=%s, pool_size=%d, max_overflow=%d",
-            table_name, pool_size, max_overflow
+            "PostgresStoreAdapter initialized: table=%s, vector_type=%s, pool_size=%d, max_overflow=%d",
+            table_name, self.vector_type, pool_size, max_overflow
         )
         
         # Ensure pgvector extension and table exist
@@ -101,7 +169,7 @@ class PostgresStoreAdapter:
             conn.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
             
             # Create table with search_vector for hybrid search and page_number for deep linking
-            # Note: vector(3072) for text-embedding-3-large model
+            # Note: 3072 dims for text-embedding-3-large model
             conn.execute(text(f"""
                 CREATE TABLE IF NOT EXISTS {self.table_name} (
                     id TEXT PRIMARY KEY,
@@ -109,7 +177,7 @@ class PostgresStoreAdapter:
                     chunk_index INTEGER,
                     page_number INTEGER,
                     text TEXT,
-                    embedding vector(3072),
+                    embedding {self.vector_type}(3072),
                     metadata JSONB,
                     search_vector tsvector,
                     created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
@@ -125,7 +193,8 @@ class PostgresStoreAdapter:
             # Create HNSW index for faster vector search
             conn.execute(text(f"""
                 CREATE INDEX IF NOT EXISTS {self.table_name}_embedding_idx 
-                ON {self.table_name} USING hnsw (embedding vector_cosine_ops)
+                ON {self.table_name} USING hnsw (embedding {VECTOR_TYPES[self.vector_type]})
+                WITH (m = {self.hnsw_m}, ef_construction = {self.hnsw_ef_construction})
             """))
             
             # Create GIN index for fast keyword search
@@ -145,6 +214,19 @@ class PostgresStoreAdapter:
             
         session = self.Session()
         try:
+            # Insert or update
+            # We use to_tsvector('english', :text) to populate the search vector
+            stmt = text(f"""
+                INSERT INTO {self.table_name} (id, doc_id, chunk_index, page_number, text, embedding, metadata, search_vector)
+                VALUES (:id, :doc_id, :chunk_index, :page_number, :text, :embedding, :metadata, to_tsvector('english', :text))
+                ON CONFLICT (id) DO UPDATE SET
+                    text = EXCLUDED.text,
+                    embedding = EXCLUDED.embedding,
+                    metadata = EXCLUDED.metadata,
+                    page_number = EXCLUDED.page_number,
+                    search_vector = to_tsvector('english', EXCLUDED.text)
+            """)
+            rows = []
             for chunk, emb in zip(chunks, embeddings):
                 # Prepare metadata
                 meta = chunk.get("metadata", {}).copy()
@@ -153,29 +235,19 @@ class PostgresStoreAdapter:
                 chunk_index = chunk.get("chunk_index") or meta.get("chunk_index") or 0
                 page_number = chunk.get("page_number") or meta.get("page") or meta.get("page_number")
                 text_content = chunk.get("text") or meta.get("text") or ""
-                
-                # Insert or update
-                # We use to_tsvector('english', :text) to populate the search vector
-                stmt = text(f"""
-                    INSERT INTO {self.table_name} (id, doc_id, chunk_index, page_number, text, embedding, metadata, search_vector)
-                    VALUES (:id, :doc_id, :chunk_index, :page_number, :text, :embedding, :metadata, to_tsvector('english', :text))
-                    ON CONFLICT (id) DO UPDATE SET
-                        text = EXCLUDED.text,
-                        embedding = EXCLUDED.embedding,
-                        metadata = EXCLUDED.metadata,
-                        page_number = EXCLUDED.page_number,
-                        search_vector = to_tsvector('english', EXCLUDED.text)
-                """)
-                
-                session.execute(stmt, {
+
+                rows.append({
                     "id": chunk["id"],
                     "doc_id": doc_id,
                     "chunk_index": chunk_index,
                     "page_number": page_number,
                     "text": text_content,
-                    "embedding": str(emb),  # pgvector expects string representation or list
-                    "metadata": json.dumps(meta)
+                    "embedding": _vector_literal(emb),
+                    "metadata": _metadata_json(meta),
                 })
+            # One executemany for the whole batch instead of a round-trip per row
+            if rows:
+                session.execute(stmt, rows)
             session.commit()
         except Exception as e:
             session.rollback()
@@ -184,6 +256,95 @@ class PostgresStoreAdapter:
         finally:
             session.close()
 
+    def _tune_hnsw(self, session, limit: int, filtered: bool = False) -> None:
+        """
+        Size the HNSW candidate list for this query's transaction.
+
+        An HNSW scan returns at most hnsw.ef_search rows (pgvector default 40),
+        so a LIMIT above that silently comes back short; raise it to cover
+        the rows requested. Filters are applied to those candidates afterwards,
+        so filtered queries also enable iterative scans when configured.
+        """
+        ef_search = max(self.hnsw_ef_search or 40, int(limit))
+        if ef_search != 40:  # skip the extra statement at the default
+            session.execute(text(f"SET LOCAL hnsw.ef_search = {ef_search}"))
+        if filtered and self.hnsw_iterative_scan:
+            session.execute(text(f"SET LOCAL hnsw.iterative_scan = {self.hnsw_iterative_scan}"))
+
+    @staticmethod
+    def _build_where_clause(filters: Optional[Dict[str, Any]], params: Dict[str, Any]) -> str:
+        """
+        Translate retrieval filters into a SQL WHERE clause, adding bind params in place.
+
+        Filtering happens inside the ANN query so the LIMIT is spent on rows that
+        survive the filters instead of being discarded afterwards in Python.
+        """
+        if not filters:
+            return ""
+
+        where_clauses = []
+        if filters.get("doc_id"):
+            where_clauses.append("doc_id = :filter_doc_id")
+            params["filter_doc_id"] = filters["doc_id"]
+
+        if filters.get("year_min") is not None:
+            # Use NULLIF to handle empty strings, COALESCE for nulls
+            where_clauses.append("COALESCE(NULLIF(metadata->>'year', '')::int, 0) >= :year_min")
+            params["year_min"] = filters["year_min"]
+
+        if filters.get("year_max") is not None:
+            # Use NULLIF to handle empty strings, COALESCE for nulls
+            where_clauses.append("COALESCE(NULLIF(metadata->>'year', '')::int, 9999) <= :year_max")
+            params["year_max"] = filters["year_max"]
+
+        # Filter by text content containing any of the keywords/phrases.
+        # Accepts a single string or a list (matches the API's "contains" filter).
+        contains_val = filters.get("contains")
+        if isinstance(contains_val, str):
+            contains_val = [contains_val]
+        keywords = [str(kw) for kw in (contains_val or []) if str(kw).strip()]
+        if keywords:
+            where_clauses.append("text ILIKE ANY(:contains_patterns)")
+            params["contains_patterns"] = [f"%{_escape_like(kw)}%" for kw in keywords]
+
+        if not where_clauses:
+            return ""
+        return "WHERE " + " AND ".join(where_clauses)
+
+    def get_metadata_batch(self, ids: List[str]) -> Dict[str, Dict[str, Any]]:
+        """
+        Fetch chunk records for many ids in one round-trip.
+
+        Returns {id: record} with the JSONB metadata flattened alongside the
+        core columns (id, doc_id, chunk_index, page_number, text). Unknown ids
+        are simply absent.
+        """
+        ids = [i for i in dict.fromkeys(ids) if i]
+        if not ids:
+            return {}
+        session = self.Session()
+        try:
+            stmt = text(f"""
+                SELECT id, doc_id, chunk_index, page_number, text, metadata
+                FROM {self.table_name}
+                WHERE id = ANY(:ids)
+            """)
+            out: Dict[str, Dict[str, Any]] = {}
+            for row in session.execute(stmt, {"ids": ids}):
+                rec = dict(row.metadata or {})
+                rec.update({
+                    "id": row.id,
+                    "doc_id": row.doc_id,
+                    "chunk_index": row.chunk_index,
+                    "text": row.text,
+                })
+                if row.page_number is not None:
+                    rec.setdefault("page", row.page_number)
+                out[row.id] = rec
+            return out
+        finally:
+            session.close()
+
     def search_raw(self, query_text: str, top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         """
         Search for similar chunks using hybrid search (vector + keyword) and metadata filtering.
@@ -213,40 +374,12 @@ class PostgresStoreAdapter:
         """
         session = self.Session()
         try:
-            # Build WHERE clause for filters
-            where_clauses = []
             params = {
-                "embedding": str(embedding),
+                "embedding": _vector_literal(embedding),
                 "top_k": top_k
             }
-            
-            if filters:
-                if "doc_id" in filters:
-                    where_clauses.append("doc_id = :filter_doc_id")
-                    params["filter_doc_id"] = filters["doc_id"]
-                
-                if "year_min" in filters:
-                    # Use NULLIF to handle empty strings, COALESCE for nulls
-                    where_clauses.append("COALESCE(NULLIF(metadata->>'year', '')::int, 0) >= :year_min")
-                    params["year_min"] = filters["year_min"]
-                    
-                if "year_max" in filters:
-                    # Use NULLIF to handle empty strings, COALESCE for nulls  
-                    where_clauses.append("COALESCE(NULLIF(metadata->>'year', '')::int, 9999) <= :year_max")
-                    params["year_max"] = filters["year_max"]
-                
-                if "contains" in filters:
-                    # Filter by text content containing a keyword/phrase
-                    contains_val = filters["contains"]
-                    if contains_val:
-                        where_clauses.append("text ILIKE :contains_pattern")
-                        params["contains_pattern"] = f"%{contains_val}%"
-
-            where_sql = " AND ".join(where_clauses)
-            if where_sql:
-                where_sql = "WHERE " + where_sql
-            else:
-                where_sql = ""
+            where_sql = self._build_where_clause(filters, params)
+            self._tune_hnsw(session, top_k, filtered=bool(where_sql))
 
             stmt = text(f"""
                 SELECT id, doc_id, chunk_index, text, metadata,
@@ -277,42 +410,13 @@ class PostgresStoreAdapter:
     def search_hybrid(self, query_text: str, embedding: List[float], top_k: int = 10, filters: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
         session = self.Session()
         try:
-            # Build WHERE clause for filters
-            where_clauses = []
             params = {
-                "embedding": str(embedding),
+                "embedding": _vector_literal(embedding),
                 "query_text": query_text,
                 "top_k": top_k
             }
-            
-            if filters:
-                if "doc_id" in filters:
-                    where_clauses.append("doc_id = :filter_doc_id")
-                    params["filter_doc_id"] = filters["doc_id"]
-                
-                if "year_min" in filters:
-                    # Use NULLIF to handle empty strings, COALESCE for nulls
-                    where_clauses.append("COALESCE(NULLIF(metadata->>'year', '')::int, 0) >= :year_min")
-                    params["year_min"] = filters["year_min"]
-                    
-                if "year_max" in filters:
-                    # Use NULLIF to handle empty strings, COALESCE for nulls
-                    where_clauses.append("COALESCE(NULLIF(metadata->>'year', '')::int, 9999) <= :year_max")
-                    params["year_max"] = filters["year_max"]
-                    
-                if "contains" in filters:
-                    # Filter by text content containing a keyword/phrase
-                    # Uses case-insensitive ILIKE for flexibility
-                    contains_val = filters["contains"]
-                    if contains_val:
-                        where_clauses.append("text ILIKE :contains_pattern")
-                        params["contains_pattern"] = f"%{contains_val}%"
-
-            where_sql = " AND ".join(where_clauses)
-            if where_sql:
-                where_sql = "WHERE " + where_sql
-            else:
-                where_sql = ""
+            where_sql = self._build_where_clause(filters, params)
+            self._tune_hnsw(session, top_k * 2, filtered=bool(where_sql))
 
             # Hybrid Search Query
             # Combines Vector Similarity (1 - cosine distance) and Keyword Rank (ts_rank)
@@ -1,8 +1,9 @@
 # app/chunk.py
 import argparse
+import os
 
 from rag.extract.pipeline import read_jsonl, write_jsonl
-from rag.segment.chunker import chunk_stream, get_tokenizer
+from rag.ingest.chunkers.base import chunk_stream, get_tokenizer
 
 def main():
     ap = argparse.ArgumentParser(description="Chunk cleaned JSONL")
@@ -11,15 +12,22 @@ def main():
     ap.add_argument("--max_tokens", type=int, default=896)
     ap.add_argument("--overlap", type=int, default=128)
     ap.add_argument("--model", default=None, help="tokenizer model (defaults to EMB_MODEL or BGE-small).")
+    ap.add_argument("--workers", type=int, default=1, help="records tokenized concurrently (default: 1 = serial).")
     args = ap.parse_args()
 
+    if args.workers > 1:
+        # Record-level threads replace the tokenizer's own Rust thread pool;
+        # running both just oversubscribes the cores
+        os.environ.setdefault("TOKENIZERS_PARALLELISM", "false")
+
     tokenizer = get_tokenizer(args.model)
-    records = read_jsonl(args.inp)
+    records = read_jsonl(args.inp, skip_empty_text=True)
     chunks_iter = chunk_stream(
         records,
         max_tokens=args.max_tokens,
         overlap=args.overlap,
         tokenizer=tokenizer,
+        workers=args.workers,
     )
 
     count = write_jsonl(args.outp, chunks_iter)
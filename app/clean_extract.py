@@ -6,10 +6,11 @@ def main():
     ap = argparse.ArgumentParser(description="Clean per-document JSONL for RAG ingestion")
     ap.add_argument("--in", dest="inp", required=True, help="Path to raw docs.jsonl")
     ap.add_argument("--out", dest="out", required=True, help="Path to cleaned.jsonl")
+    ap.add_argument("--workers", type=int, default=1, help="Cleaning processes (default: 1 = serial)")
     args = ap.parse_args()
 
-    recs = read_jsonl(args.inp)
-    cleaned = list(clean_records(recs))
+    recs = read_jsonl(args.inp, skip_empty_text=True)
+    cleaned = list(clean_records(recs, workers=args.workers))
     write_jsonl(args.out, cleaned)
 
 if __name__ == "__main__":
@@ -84,7 +84,12 @@ def build_pipeline(cfg_path: str = None):
     store = PostgresStoreAdapter(
         table_name=vs_cfg.get("table_name", "chunks"),
         connection_string=os.environ.get("POSTGRES_CONNECTION_STRING"),
-        embedder=emb
+        embedder=emb,
+        vector_type=vs_cfg.get("vector_type", "vector"),
+        hnsw_m=vs_cfg.get("hnsw_m", 16),
+        hnsw_ef_construction=vs_cfg.get("hnsw_ef_construction", 64),
+        hnsw_ef_search=vs_cfg.get("hnsw_ef_search"),
+        hnsw_iterative_scan=vs_cfg.get("hnsw_iterative_scan"),
     )
 
     # ---------------- Reranker ----------------
@@ -510,4 +515,12 @@ def build_pipeline(cfg_path: str = None):
         )
 
     # Default: native pipeline
-    return QAPipeline(emb, store, reranker, llm)
+    cache_cfg = cfg.get("answer_cache", {}) or {}
+    return QAPipeline(
+        emb,
+        store,
+        reranker,
+        llm,
+        cache_ttl=float(cache_cfg.get("ttl_s", 0) or 0),
+        cache_size=int(cache_cfg.get("max_entries", 256) or 256),
+    )
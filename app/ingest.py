@@ -10,8 +10,13 @@ Features:
 """
 import argparse
 import csv
+import hashlib
+import json
 import os
+import re
 import yaml
+from collections import Counter
+from itertools import islice
 from pathlib import Path
 from dataclasses import asdict
 from dotenv import load_dotenv
@@ -24,6 +29,16 @@ from rag.ingest_lib.parse_pdf import parse_pdf
 from rag.ingest_lib.store import write_jsonl, write_csv
 
 
+WORD_RE = re.compile(r"\S+")  # same tokens as str.split()
+
+
+def has_min_words(text: str, n: int) -> bool:
+    """True once n whitespace-separated words are seen; never builds the word list."""
+    if n <= 0:
+        return True
+    return next(islice(WORD_RE.finditer(text), n - 1, None), None) is not None
+
+
 def load_cfg(path: str):
     with open(path, "r") as f:
         return yaml.safe_load(f)
@@ -75,9 +90,41 @@ def load_csv_metadata(csv_path: str) -> dict:
     return metadata_map
 
 
+def parse_with_cache(get_parser, parser_type: str, pdf_path: str, cache_dir: str = None):
+    """
+    Parse a PDF, reusing earlier page output for byte-identical files.
+
+    Azure analysis is the slow, billed step; results are keyed by the PDF's
+    sha256 so re-runs and duplicate downloads skip it entirely.
+    """
+    if not cache_dir:
+        return get_parser().parse(pdf_path)
+
+    h = hashlib.sha256()
+    with open(pdf_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    cache_path = Path(cache_dir) / f"{parser_type}-{h.hexdigest()[:16]}.json"
+
+    if cache_path.exists():
+        try:
+            return json.loads(cache_path.read_text(encoding="utf-8"))
+        except ValueError:
+            print(f"[warn] ignoring corrupt parse cache {cache_path}")
+
+    pages = get_parser().parse(pdf_path)
+    cache_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = cache_path.with_suffix(".tmp")
+    tmp_path.write_text(json.dumps(pages), encoding="utf-8")
+    os.replace(tmp_path, cache_path)
+    return pages
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument("--config", default="configs/ingestion/default.yaml")
+    ap.add_argument("--parse-workers", type=int, default=1,
+                    help="Processes per large PDF for the default pypdf parser (default: 1 = serial)")
     args = ap.parse_args()
 
     cfg = load_cfg(args.config)
@@ -142,9 +189,28 @@ def main():
         pg_store = PostgresStoreAdapter(
             table_name=cfg.get("storage", {}).get("table_name", "chunks"),
             connection_string=os.environ.get("POSTGRES_CONNECTION_STRING"),
-            embedder=embedder
+            embedder=embedder,
+            vector_type=cfg.get("storage", {}).get("vector_type", "vector"),
+            hnsw_m=cfg.get("storage", {}).get("hnsw_m", 16),
+            hnsw_ef_construction=cfg.get("storage", {}).get("hnsw_ef_construction", 64),
         )
 
+    # One parser (and Azure client/connection pool) for the whole run,
+    # built only when a PDF misses the parse cache
+    parser = None
+    parse_cache_dir = cfg.get("parse_cache_dir", "data/cache/parsed")
+
+    def get_parser():
+        nonlocal parser
+        if parser is None:
+            if parser_type == "azure_read":
+                from rag.ingest_lib.parser_azure_read import AzureReadParser
+                parser = AzureReadParser()
+            else:
+                from rag.ingest_lib.parser_azure import AzureParser
+                parser = AzureParser()
+        return parser
+
     # Limit processed documents (set high for production)
     doc_limit = cfg.get("limit", 100)
     
@@ -177,9 +243,7 @@ def main():
         try:
             if parser_type == "azure_read":
                 # New simplified Azure Read parser (no bbox)
-                from rag.ingest_lib.parser_azure_read import AzureReadParser
-                parser = AzureReadParser()
-                pages = parser.parse(pdf_path)
+                pages = parse_with_cache(get_parser, parser_type, pdf_path, parse_cache_dir)
                 
                 full_text = "\n\n".join([p["text"] for p in pages])
                 
@@ -202,9 +266,7 @@ def main():
                 })()
             elif parser_type == "azure":
                 # Legacy Azure Layout parser (with bbox - deprecated)
-                from rag.ingest_lib.parser_azure import AzureParser
-                parser = AzureParser()
-                pages = parser.parse(pdf_path)
+                pages = parse_with_cache(get_parser, parser_type, pdf_path, parse_cache_dir)
                 
                 full_text = "\n\n".join([p["text"] for p in pages])
                 
@@ -229,6 +291,7 @@ def main():
                         "title": link.title or "",
                         "year": link.year or "",
                     },
+                    workers=args.parse_workers,
                 )
         except Exception as e:
             print(f"[error] failed to parse {pdf_path}: {e}")
@@ -317,7 +380,7 @@ def main():
                 chunk_counter = 0
                 for text_chunk in chunks:
                     # Skip tiny chunks
-                    if len(text_chunk.split()) < min_chunk_tokens // 4:
+                    if not has_min_words(text_chunk, min_chunk_tokens // 4):
                         continue
                     
                     chunk_id = f"{rec['id']}_p{page_num}_{chunk_counter}"
@@ -350,12 +413,24 @@ def main():
         
         print(f"[chunks] generated {len(all_chunks)} chunks from {len(records)} documents")
         
-        # Batch embed and store
+        # Batch embed and store. Boilerplate (headers, disclaimers) repeats
+        # across pages and reports, so each distinct text is embedded once;
+        # its vector is kept only until its last occurrence has been pushed.
+        remaining = Counter(c["text"] for c in all_chunks)
+        shared_vecs = {}
+        print(f"[embed] {len(remaining)} distinct texts across {len(all_chunks)} chunks")
         batch_size = 100
         for i in range(0, len(all_chunks), batch_size):
             batch = all_chunks[i:i+batch_size]
             texts = [c["text"] for c in batch]
-            embeddings = pg_store.embedder.embed_texts(texts)
+            todo = [t for t in dict.fromkeys(texts) if t not in shared_vecs]
+            if todo:
+                shared_vecs.update(zip(todo, pg_store.embedder.embed_texts(todo)))
+            embeddings = [shared_vecs[t] for t in texts]
+            for t in texts:
+                remaining[t] -= 1
+                if not remaining[t]:
+                    del shared_vecs[t]
             pg_store.add_documents(batch, embeddings)
             print(f"   pushed batch {i//batch_size + 1}: {len(batch)} chunks")
 
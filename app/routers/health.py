@@ -7,6 +7,7 @@ Health check endpoint for monitoring and deployment probes.
 
 import os
 import logging
+from functools import lru_cache
 from fastapi import APIRouter
 
 logger = logging.getLogger(__name__)
@@ -17,6 +18,27 @@ router = APIRouter(tags=["health"])
 IS_PRODUCTION = os.environ.get("ENVIRONMENT", "").lower() == "production"
 
 
+# Probes run every few seconds: keep one small engine and one pipeline per
+# process instead of rebuilding them (pool, DDL, API clients) on every call.
+# Failed builds raise and are not cached, so the next probe retries.
+@lru_cache(maxsize=1)
+def _probe_engine(conn_str: str):
+    from sqlalchemy import create_engine
+    return create_engine(conn_str, pool_size=1, max_overflow=0, pool_pre_ping=True)
+
+
+@lru_cache(maxsize=1)
+def _pipeline():
+    from app.factory import build_pipeline
+    return build_pipeline()
+
+
+def _ping_db(conn_str: str) -> None:
+    from sqlalchemy import text
+    with _probe_engine(conn_str).connect() as conn:
+        conn.execute(text("SELECT 1"))
+
+
 @router.get("/health")
 def health():
     """
@@ -27,14 +49,10 @@ def health():
     
     # Check database connectivity
     try:
-        from app.adapters.vector_postgres import PostgresStoreAdapter
         conn_str = os.environ.get("POSTGRES_CONNECTION_STRING")
         if conn_str:
             # Quick connectivity test
-            from sqlalchemy import create_engine, text
-            engine = create_engine(conn_str)
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
+            _ping_db(conn_str)
             result["database"] = "connected"
         else:
             result["database"] = "not_configured"
@@ -46,8 +64,7 @@ def health():
     # Only include internal details in development mode
     if not IS_PRODUCTION:
         try:
-            from app.factory import build_pipeline
-            pipeline = build_pipeline()
+            pipeline = _pipeline()
             result["orchestrator"] = "langchain" if hasattr(pipeline, "stream") else "native"
             result["streaming"] = bool(getattr(pipeline, "stream", None))
         except Exception as e:
@@ -69,10 +86,7 @@ def readiness():
     try:
         conn_str = os.environ.get("POSTGRES_CONNECTION_STRING")
         if conn_str:
-            from sqlalchemy import create_engine, text
-            engine = create_engine(conn_str)
-            with engine.connect() as conn:
-                conn.execute(text("SELECT 1"))
+            _ping_db(conn_str)
         else:
             errors.append("database_not_configured")
     except Exception as e:
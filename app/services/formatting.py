@@ -4,7 +4,14 @@ Common helpers for formatting snippets and metadata across native, CLI, and Lang
 
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import json
+from typing import Any, Dict, List, Optional
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # optional speedup; stdlib json is the fallback
+    _loads = json.loads
 
 
 def format_snippet(text: str, length: int = 320) -> str:
@@ -60,6 +67,9 @@ def format_metadata(meta: Dict[str, Any]) -> str:
 
 
 def _coerce_page(value: Any) -> Optional[int]:
+    if type(value) is int:
+        # Common case (already-normalised page numbers): skip the generic path
+        return value if value >= 1 else 1
     if isinstance(value, list) and value:
         value = value[0]
     if value in (None, "", []):
@@ -76,17 +86,18 @@ def _calculate_bbox(bboxes: Any) -> Optional[List[float]]:
     Handles both OLD format (polygon) and NEW format (simplified [x,y,w,h]).
     Returns [x, y, width, height] in points.
     """
-    import json
     if isinstance(bboxes, str):
         try:
-            bboxes = json.loads(bboxes)
+            bboxes = _loads(bboxes)
         except Exception:
             return None
             
     if not bboxes or not isinstance(bboxes, list):
         return None
 
-    all_x1, all_y1, all_x2, all_y2 = [], [], [], []
+    # Running union instead of collecting four coordinate lists per call
+    min_x = min_y = float("inf")
+    max_x = max_y = float("-inf")
     
     for item in bboxes:
         # NEW FORMAT: {"text": "...", "bbox": [x, y, w, h]} - already in points
@@ -94,10 +105,10 @@ def _calculate_bbox(bboxes: Any) -> Optional[List[float]]:
             bbox = item.get("bbox")
             if bbox and isinstance(bbox, list) and len(bbox) >= 4:
                 x, y, w, h = bbox[:4]
-                all_x1.append(x)
-                all_y1.append(y)
-                all_x2.append(x + w)
-                all_y2.append(y + h)
+                min_x = min(min_x, x)
+                min_y = min(min_y, y)
+                max_x = max(max_x, x + w)
+                max_y = max(max_y, y + h)
                 continue
         
         # OLD FORMAT: {"text": "...", "polygon": [...]} - in inches
@@ -107,18 +118,13 @@ def _calculate_bbox(bboxes: Any) -> Optional[List[float]]:
             xs = poly[0::2]
             ys = poly[1::2]
             # Convert inches to points (72 DPI)
-            all_x1.append(min(xs) * 72)
-            all_y1.append(min(ys) * 72)
-            all_x2.append(max(xs) * 72)
-            all_y2.append(max(ys) * 72)
+            min_x = min(min_x, min(xs) * 72)
+            min_y = min(min_y, min(ys) * 72)
+            max_x = max(max_x, max(xs) * 72)
+            max_y = max(max_y, max(ys) * 72)
         
-    if not all_x1:
+    if min_x == float("inf"):
         return None
-        
-    min_x = min(all_x1)
-    min_y = min(all_y1)
-    max_x = max(all_x2)
-    max_y = max(all_y2)
     
     return [min_x, min_y, max_x - min_x, max_y - min_y]
 
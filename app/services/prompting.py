@@ -108,9 +108,7 @@ PERSONAS = {
 DEFAULT_PERSONA = "grower"
 
 
-def get_system_prompt(persona: str = DEFAULT_PERSONA) -> str:
-    """Get the system prompt for a specific persona."""
-    config = PERSONAS.get(persona, PERSONAS[DEFAULT_PERSONA])
+def _render_system_prompt(config: dict) -> str:
     prompt = config["system"]
     # Only researcher uses the strict base instructions
     if "{base_instructions}" in prompt:
@@ -118,6 +116,20 @@ def get_system_prompt(persona: str = DEFAULT_PERSONA) -> str:
     return prompt
 
 
+# Rendered once at import; keyed only by the fixed persona names
+_SYSTEM_PROMPTS = {name: _render_system_prompt(config) for name, config in PERSONAS.items()}
+
+
+def resolve_persona(persona: str) -> str:
+    """Map a client-supplied persona to a known PERSONAS key (unknown -> default)."""
+    return persona if persona in PERSONAS else DEFAULT_PERSONA
+
+
+def get_system_prompt(persona: str = DEFAULT_PERSONA) -> str:
+    """Get the system prompt for a specific persona (pre-rendered at import)."""
+    return _SYSTEM_PROMPTS[resolve_persona(persona)]
+
+
 def get_persona_config(persona: str = DEFAULT_PERSONA) -> dict:
     """Get full configuration for a persona including behavior flags."""
     return PERSONAS.get(persona, PERSONAS[DEFAULT_PERSONA])
@@ -3,13 +3,19 @@ End-to-end QA pipeline: embed query -> retrieve -> (optional) rerank -> build pr
 Returns the generated answer and normalized source list for the API layer.
 """
 
+import asyncio
+import copy
+import json
 import logging
-from time import perf_counter
-from typing import Dict, List, Optional, Any
+import threading
+from collections import OrderedDict
+from time import monotonic, perf_counter
+from typing import Dict, List, Optional, Any, Tuple
 from app.ports import EmbedderPort, VectorStorePort, RerankerPort, LLMPort
 from app.services.prompting import get_system_prompt, build_user_prompt, allows_general_knowledge, DEFAULT_PERSONA
 from app.services.formatting import format_citation, format_metadata, format_snippet
 from rag.retrieval.utils import (
+    RetrievalSettings,
     resolve_retrieval_settings,
     prepare_hits,
 )
@@ -18,31 +24,66 @@ logger = logging.getLogger(__name__)
 
 
 class QAPipeline:
-    def __init__(self, emb: EmbedderPort, store: VectorStorePort, rerank: RerankerPort, llm: LLMPort):
+    def __init__(
+        self,
+        emb: EmbedderPort,
+        store: VectorStorePort,
+        rerank: RerankerPort,
+        llm: LLMPort,
+        *,
+        cache_ttl: float = 0.0,
+        cache_size: int = 256,
+    ):
         self.emb, self.store, self.rerank, self.llm = emb, store, rerank, llm
-
-    def ask(
+        # Exact-match answer cache for ask(); cache_ttl <= 0 disables it
+        self.cache_ttl = max(0.0, float(cache_ttl or 0.0))
+        self.cache_size = max(1, int(cache_size))
+        self._cache: "OrderedDict[str, Tuple[float, Dict]]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+
+    @staticmethod
+    def _cache_key(q: str, **params: Any) -> str:
+        """Normalise question + every answer-affecting argument into one key."""
+        params["question"] = " ".join(q.split()).lower()
+        filters = params.get("filters")
+        if hasattr(filters, "model_dump"):
+            params["filters"] = filters.model_dump(exclude_none=True)
+        return json.dumps(params, sort_keys=True, default=str)
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        with self._cache_lock:
+            entry = self._cache.get(key)
+            if entry is None:
+                return None
+            stored_at, result = entry
+            if monotonic() - stored_at > self.cache_ttl:
+                del self._cache[key]
+                return None
+            self._cache.move_to_end(key)
+        return copy.deepcopy(result)
+
+    def _cache_put(self, key: str, result: Dict) -> None:
+        with self._cache_lock:
+            self._cache[key] = (monotonic(), copy.deepcopy(result))
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+
+    def _retrieve(
         self,
-        question: str,
-        k: int = 6,
-        temperature: float = 0.2,
-        max_tokens: int = 600,
+        q: str,
+        k: int,
         *,
-        mode: Optional[str] = None,           # "dense" | "bm25" | "hybrid" (store may ignore)
-        filters: Optional[Dict[str, Any]] = None,  # e.g., {"year_min": 2019, "year_max": 2025}
-        rerank: Optional[bool] = None,        # True to force, False to skip, None = default behavior
-        persona: Optional[str] = None         # "researcher" | "grower" | "extension_officer"
-    ) -> Dict:
+        mode: Optional[str] = None,
+        filters: Optional[Dict[str, Any]] = None,
+        rerank: Optional[bool] = None,
+    ) -> Tuple[RetrievalSettings, List[Dict[str, Any]], Dict[str, Any]]:
         """
-        Returns dict with keys: answer, sources, usage
-        - sources is a list of dicts with: sid, doc_id, title, page, url, score, snippet
+        Shared retrieval path for ask() and stream():
+        embed -> ANN (with pushed-down filters) -> stitch -> optional rerank -> top k.
+        Returns (settings, hits, timing) where timing holds per-stage milliseconds.
         """
-        q = (question or "").strip()
-        if not q:
-            return {"answer": "", "sources": [], "usage": {"error": "empty_question"}}
-
         # 1) embed query
-        total_start = perf_counter()
         qv = self.emb.embed_query(q)
 
         # 2) retrieve top-k (be graceful if the store doesn't support extra kwargs)
@@ -53,6 +94,10 @@ class QAPipeline:
             store_filters["year_min"] = settings.year_min
         if settings.year_max is not None:
             store_filters["year_max"] = settings.year_max
+        if settings.contains:
+            # Pushed into the store query so the overfetch isn't wasted on rows
+            # prepare_hits would drop anyway.
+            store_filters["contains"] = settings.contains
 
         rerank_topn = None
         if hasattr(self.rerank, "topn"):
@@ -71,21 +116,28 @@ class QAPipeline:
         if store_filters:
             query_kwargs["filters"] = store_filters
 
+        # Stores that apply the filters in-query let prepare_hits skip its
+        # per-hit safety-net re-check
+        prefiltered = bool(store_filters) and bool(getattr(self.store, "supports_prefilter", False))
+
         ann_start = perf_counter()
         try:
             hits = self.store.query(qv, **query_kwargs)
         except TypeError:
             # Older stores: only accept (vector, k)
             hits = self.store.query(qv, k=overfetch)
+            prefiltered = False
         ann_ms = (perf_counter() - ann_start) * 1000.0
 
-        # 4) stitch metadata before reranking
+        # 3) stitch metadata before reranking
         stitch_start = perf_counter()
-        stitched_hits = prepare_hits(hits, self.store, settings, limit=candidate_limit)
+        stitched_hits = prepare_hits(
+            hits, self.store, settings, limit=candidate_limit, prefiltered=prefiltered
+        )
         logger.debug("candidates_before_rerank=%d", len(stitched_hits))
         stitch_ms = (perf_counter() - stitch_start) * 1000.0
 
-        # 5) optional rerank
+        # 4) optional rerank
         do_rerank = True if rerank is None else bool(rerank)
         rerank_ms = 0.0
         final_hits = stitched_hits
@@ -97,10 +149,53 @@ class QAPipeline:
             except Exception:
                 # If reranker explodes, limp along with the original ranking
                 final_hits = stitched_hits
-        
-        # 6) limit to requested k after rerank
-        hits = final_hits[:k]
-        logger.debug("after_rerank=%d final_k=%d", len(final_hits), len(hits))
+
+        # 5) limit to requested k after rerank
+        top_hits = final_hits[:k]
+        logger.debug("after_rerank=%d final_k=%d", len(final_hits), len(top_hits))
+
+        timing = {
+            "ann_ms": ann_ms,
+            "stitch_ms": stitch_ms,
+            "rerank_ms": rerank_ms,
+            "do_rerank": do_rerank,
+        }
+        return settings, top_hits, timing
+
+    def ask(
+        self,
+        question: str,
+        k: int = 6,
+        temperature: float = 0.2,
+        max_tokens: int = 600,
+        *,
+        mode: Optional[str] = None,           # "dense" | "bm25" | "hybrid" (store may ignore)
+        filters: Optional[Dict[str, Any]] = None,  # e.g., {"year_min": 2019, "year_max": 2025}
+        rerank: Optional[bool] = None,        # True to force, False to skip, None = default behavior
+        persona: Optional[str] = None         # "researcher" | "grower" | "extension_officer"
+    ) -> Dict:
+        """
+        Returns dict with keys: answer, sources, usage
+        - sources is a list of dicts with: sid, doc_id, title, page, url, score, snippet
+        """
+        q = (question or "").strip()
+        if not q:
+            return {"answer": "", "sources": [], "usage": {"error": "empty_question"}}
+
+        cache_key = None
+        if self.cache_ttl > 0:
+            cache_key = self._cache_key(
+                q, k=k, temperature=temperature, max_tokens=max_tokens, mode=mode,
+                filters=filters, rerank=rerank, persona=persona,
+            )
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                # Repeat question: skip embed, ANN, rerank and the LLM call
+                return cached
+
+        total_start = perf_counter()
+        settings, hits, timing = self._retrieve(q, k, mode=mode, filters=filters, rerank=rerank)
+        do_rerank = timing["do_rerank"]
 
         if not hits:
             # no retrieval = don't pay LLM tax
@@ -142,7 +237,7 @@ class QAPipeline:
         rerank_batches = getattr(self.rerank, "last_batches", 0) if do_rerank else 0
         logger.info(
             "QA timing: ANN=%.1fms stitch=%.1fms rerank=%.1fms total=%.1fms rerank_batches=%d",
-            ann_ms, stitch_ms, rerank_ms, total_ms, rerank_batches
+            timing["ann_ms"], timing["stitch_ms"], timing["rerank_ms"], total_ms, rerank_batches
         )
 
         if citations:
@@ -171,7 +266,10 @@ class QAPipeline:
 
             answer = f"{answer.strip()}\n\nSources:\n" + "\n".join(f"- {line}" for line in formatted_sources)
 
-        return {"answer": answer, "sources": citations, "usage": usage}
+        result = {"answer": answer, "sources": citations, "usage": usage}
+        if cache_key is not None:
+            self._cache_put(cache_key, result)
+        return result
 
     async def stream(
         self,
@@ -196,51 +294,11 @@ class QAPipeline:
             yield {"type": "error", "message": "empty_question"}
             return
 
-        # Reuse retrieval logic (copy-paste for now to avoid refactoring risk)
-        # In a real refactor, extract retrieval into _retrieve()
-        
-        # 1) embed query
-        qv = self.emb.embed_query(q)
-
-        # 2) retrieve top-k
-        settings = resolve_retrieval_settings(filters)
-        store_filters = {}
-        if settings.year_min is not None: store_filters["year_min"] = settings.year_min
-        if settings.year_max is not None: store_filters["year_max"] = settings.year_max
-
-        rerank_topn = None
-        if hasattr(self.rerank, "topn"):
-            try:
-                rerank_topn = int(getattr(self.rerank, "topn"))
-            except (TypeError, ValueError):
-                rerank_topn = None
-        candidate_limit = max(k * 5, rerank_topn if rerank_topn else 0)
-        if candidate_limit <= 0: candidate_limit = k * 5
-
-        overfetch = candidate_limit
-        query_kwargs = {"k": overfetch}
-        if mode is not None: query_kwargs["mode"] = mode
-        if store_filters: query_kwargs["filters"] = store_filters
-
-        try:
-            hits = self.store.query(qv, **query_kwargs)
-        except TypeError:
-            hits = self.store.query(qv, k=overfetch)
-
-        # 4) stitch
-        stitched_hits = prepare_hits(hits, self.store, settings, limit=candidate_limit)
-
-        # 5) rerank
-        do_rerank = True if rerank is None else bool(rerank)
-        final_hits = stitched_hits
-        if do_rerank:
-            try:
-                final_hits = self.rerank.rerank(q, stitched_hits)
-            except Exception:
-                final_hits = stitched_hits
-        
-        # 6) limit
-        hits = final_hits[:k]
+        # Embedding, ANN and rerank are blocking network calls: run them off
+        # the event loop so concurrent streams aren't serialised behind them
+        settings, hits, _ = await asyncio.to_thread(
+            self._retrieve, q, k, mode=mode, filters=filters, rerank=rerank
+        )
 
         if not hits:
             yield {"type": "token", "token": "I couldn’t find relevant passages in the current corpus for that question."}
@@ -282,10 +340,17 @@ class QAPipeline:
         user = build_user_prompt(q, "\n\n".join(lines), hybrid=hybrid_mode)
         
         if hasattr(self.llm, "chat_stream"):
-            for token in self.llm.chat_stream(system_prompt, user, temperature, max_tokens):
+            # The adapter yields from a blocking HTTP stream; pull each token
+            # in a worker thread instead of stalling the loop between tokens
+            tokens = self.llm.chat_stream(system_prompt, user, temperature, max_tokens)
+            done = object()
+            while True:
+                token = await asyncio.to_thread(next, tokens, done)
+                if token is done:
+                    break
                 yield {"type": "token", "token": token}
         else:
             # Fallback to sync
-            ans, usage = self.llm.chat(system_prompt, user, temperature, max_tokens)
+            ans, usage = await asyncio.to_thread(self.llm.chat, system_prompt, user, temperature, max_tokens)
             yield {"type": "token", "token": ans}
             yield {"type": "usage", "data": usage}
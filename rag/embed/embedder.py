@@ -13,11 +13,14 @@ class Embedder:
         batch_size: int = 64,
         normalize_embeddings: bool = True,
         show_progress_bar: bool = True,
+        dtype: np.dtype = np.float32,
     ) -> np.ndarray:
+        # Pass dtype=np.float16 to halve memory for halfvec stores; copy=False
+        # skips the redundant copy when the model already returns that dtype.
         return self.model.encode(
             texts,
             batch_size=batch_size,
             convert_to_numpy=True,
             normalize_embeddings=normalize_embeddings,
             show_progress_bar=show_progress_bar,
-        ).astype(np.float32)
+        ).astype(dtype, copy=False)
@@ -2,14 +2,30 @@
 import re
 import unicodedata
 
+try:  # optional: PyICU normalizes faster than unicodedata on large documents
+    from icu import Normalizer2, UNormalizationCheckResult
+    _ICU_NFC = Normalizer2.getNFCInstance()
+except ImportError:
+    _ICU_NFC = None
+
 # 1) Unicode + whitespace
 CTRL = "".join(map(chr, list(range(0,9)) + [11,12] + list(range(14,32)) + [127]))
-CTRL_RE = re.compile(f"[{re.escape(CTRL)}]")
+CTRL_TABLE = str.maketrans("", "", CTRL)  # pure deletion: one C pass via str.translate
 WS_RE = re.compile(r"[ \t\u00A0]+")
 
+def _nfc(s: str) -> str:
+    # Well-formed PDF text is usually NFC already; the quick check skips the rewrite.
+    if _ICU_NFC is not None:
+        if _ICU_NFC.quickCheck(s) == UNormalizationCheckResult.YES:
+            return s
+        return _ICU_NFC.normalize(s)
+    if unicodedata.is_normalized("NFC", s):
+        return s
+    return unicodedata.normalize("NFC", s)
+
 def normalize_unicode(s: str) -> str:
-    s = unicodedata.normalize("NFC", s)
-    s = CTRL_RE.sub("", s)
+    s = _nfc(s)
+    s = s.translate(CTRL_TABLE)
     s = WS_RE.sub(" ", s)
     return s
 
@@ -21,6 +37,14 @@ PAGE_FURNITURE = re.compile(
 
 RULE_LINE = re.compile(r"^\s*[-_—]{3,}\s*$")
 
+HEADER_NOISE = re.compile(r'^(FINAL REPORT\s+TEMPLATE|CRDC ID:)', re.I)
+
+# All three furniture patterns as one alternation: one match call per line
+LINE_NOISE = re.compile(
+    "|".join(f"(?:{p.pattern})" for p in (PAGE_FURNITURE, RULE_LINE, HEADER_NOISE)),
+    re.IGNORECASE,
+)
+
 def strip_page_furniture(text: str) -> str:
     out = []
     for raw in text.splitlines():
@@ -28,21 +52,28 @@ def strip_page_furniture(text: str) -> str:
         if not line:
             out.append("")     # keep blank lines (paragraph breaks)
             continue
-        if PAGE_FURNITURE.match(line) or RULE_LINE.match(line):
+        if LINE_NOISE.match(line):
             continue
         out.append(line)
     return "\n".join(out)
 
 # 3) Hyphenation and broken lines
 HYPHEN_JOIN = re.compile(r"(\w)-\n([a-z])")   # join water-\nuse -> wateruse
-INLINE_NL   = re.compile(r"(?<!\n)\n(?!\n)")  # single newline inside a paragraph
+# single newline inside a paragraph; leading with the literal \n (lookbehind
+# after it) lets the engine jump between newlines instead of testing every char
+INLINE_NL   = re.compile(r"\n(?<!\n\n)(?!\n)")
 
 def fix_hyphenation_and_lines(s: str) -> str:
-    s = HYPHEN_JOIN.sub(r"\1\2", s)
+    # Literal `in` checks (C memchr scans) skip regex passes that can't match
+    if "-\n" in s:
+        s = HYPHEN_JOIN.sub(r"\1\2", s)
     s = INLINE_NL.sub(" ", s)
     return s
 
 # 4) Bullets/lists normalization
+INLINE_BULLETS = str.maketrans("•▪·", "---")
+ROMAN_BULLET = re.compile(r"^\(?[ivxlcdm]+\)\s+", re.I)
+
 def normalize_bullets(text: str) -> str:
     # common bullet characters
     bullets = "•▪·●◦■□–-"
@@ -58,10 +89,10 @@ def normalize_bullets(text: str) -> str:
             s = "- " + s[1:].lstrip()
 
         # also replace inline bullets (e.g. "•", "▪", "·") with a dash
-        s = re.sub(r"[•▪·]", "-", s)
+        s = s.translate(INLINE_BULLETS)
 
         # roman numerals "(i)" or "(ii)" → dash
-        s = re.sub(r"^\(?[ivxlcdm]+\)\s+", "- ", s, flags=re.I)
+        s = ROMAN_BULLET.sub("- ", s)
 
         norm.append(s)
     return "\n".join(norm)
@@ -78,11 +109,14 @@ def tidy_paragraphs(text: str) -> str:
         if not s:
             keep.append("")
             continue
-        if ONLY_PUNCT.match(s):
+        # ONLY_PUNCT can't match past 5 chars: the length test rejects
+        # ordinary prose lines without entering the regex engine
+        if len(s) <= 5 and ONLY_PUNCT.match(s):
             continue
         keep.append(s)
     out = "\n".join(keep)
-    out = MULTI_BLANKS.sub("\n\n", out)
+    if "\n\n\n" in out:
+        out = MULTI_BLANKS.sub("\n\n", out)
     return out.strip()
 
 def clean_document_text(text: str) -> str:
@@ -92,19 +126,3 @@ def clean_document_text(text: str) -> str:
     text = normalize_bullets(text)
     text = tidy_paragraphs(text)
     return text
-# rag/extract/cleaners.py
-
-HEADER_NOISE = re.compile(r'^(FINAL REPORT\s+TEMPLATE|CRDC ID:)', re.I)
-
-def strip_page_furniture(text: str) -> str:
-    out = []
-    for raw in text.splitlines():
-        line = raw.strip()
-        if not line:
-            out.append("")  # preserve blank lines as paragraph breaks
-            continue
-        if PAGE_FURNITURE.match(line) or RULE_LINE.match(line) or HEADER_NOISE.match(line):
-            continue
-        out.append(line)
-    return "\n".join(out)
-
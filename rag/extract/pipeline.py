@@ -1,29 +1,106 @@
 # rag/extract/pipeline.py
 import json
 import os
-from typing import Dict, Iterable
+import re
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from itertools import islice
+from typing import Deque, Dict, Iterable, List, Optional
 from .cleaners import clean_document_text
 
-def read_jsonl(path: str) -> Iterable[Dict]:
-    with open(path, "r", encoding="utf-8") as f:
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
+MIN_ALNUM_CHARS = 50
+ALNUM_RE = re.compile(r"[^\W_]")  # same set as str.isalnum()
+
+def has_min_alnum(txt: str, n: int = MIN_ALNUM_CHARS) -> bool:
+    """True once n alphanumeric chars are seen; stops scanning at the n-th match."""
+    if n <= 0:
+        return True
+    return next(islice(ALNUM_RE.finditer(txt), n - 1, None), None) is not None
+
+_IO_BUFFER = 1 << 20  # large buffers for GB-scale JSONL
+
+def _empty_text_line(line, key, empties) -> bool:
+    """True when the raw line's only "text" key holds "" (safe to skip unparsed).
+
+    With a single "text" key, an empty value there means the top-level text
+    is empty or absent either way; several keys (e.g. nested pages) need a parse.
+    """
+    return key in line and line.count(key) == 1 and any(e in line for e in empties)
+
+_TEXT_KEY_B, _EMPTY_TEXT_B = b'"text"', (b'"text":""', b'"text": ""')
+_TEXT_KEY_S, _EMPTY_TEXT_S = '"text"', ('"text":""', '"text": ""')
+
+def read_jsonl(path: str, skip_empty_text: bool = False) -> Iterable[Dict]:
+    """
+    Yield records from a JSONL file. With skip_empty_text, records without a
+    top-level "text" are dropped, mostly before their line is even parsed.
+    """
+    if orjson is not None:
+        # orjson parses the raw bytes: no per-line str decode
+        loads, mode, encoding, key, empties = orjson.loads, "rb", None, _TEXT_KEY_B, _EMPTY_TEXT_B
+    else:
+        loads, mode, encoding, key, empties = json.loads, "r", "utf-8", _TEXT_KEY_S, _EMPTY_TEXT_S
+    with open(path, mode, buffering=_IO_BUFFER, encoding=encoding) as f:
         for line in f:
             line = line.strip()
             if not line:
                 continue
-            yield json.loads(line)
+            if skip_empty_text and _empty_text_line(line, key, empties):
+                continue
+            rec = loads(line)
+            if skip_empty_text and not rec.get("text"):
+                continue
+            yield rec
 
 def write_jsonl(path: str, records: Iterable[Dict]) -> None:
     os.makedirs(os.path.dirname(path), exist_ok=True)
-    with open(path, "w", encoding="utf-8") as f:
+    if orjson is not None:
+        opts = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+        with open(path, "wb", buffering=_IO_BUFFER) as f:
+            f.writelines(orjson.dumps(rec, option=opts) for rec in records)
+        return
+    with open(path, "w", encoding="utf-8", buffering=_IO_BUFFER) as f:
+        f.writelines(json.dumps(rec, ensure_ascii=False) + "\n" for rec in records)
+
+def _clean_one(rec: Dict) -> Optional[Dict]:
+    """Clean a single record; None means skip. Top-level so process pools can pickle it."""
+    txt = rec.get("text", "")
+    # skip truly empty docs
+    if not txt or not has_min_alnum(txt):
+        return None
+    out = dict(rec)               # keep id/title/year/filename/meta etc.
+    out["text"] = clean_document_text(txt)
+    return out
+
+def _clean_batch(batch: List[Dict]) -> List[Dict]:
+    return [out for out in map(_clean_one, batch) if out is not None]
+
+def clean_records(records: Iterable[Dict], workers: int = 1, chunksize: int = 32) -> Iterable[Dict]:
+    """
+    Clean records in input order. Serial by default; workers > 1 fans the pure
+    CPU work out over a process pool, keeping only a bounded window of
+    `chunksize`-record batches in flight so memory stays flat on large inputs.
+    """
+    if workers <= 1:
         for rec in records:
-            f.write(json.dumps(rec, ensure_ascii=False) + "\n")
-
-def clean_records(records: Iterable[Dict]) -> Iterable[Dict]:
-    for rec in records:
-        txt = rec.get("text", "")
-        # skip truly empty docs
-        if not txt or sum(ch.isalnum() for ch in txt) < 50:
-            continue
-        out = dict(rec)               # keep id/title/year/filename/meta etc.
-        out["text"] = clean_document_text(txt)
-        yield out
+            out = _clean_one(rec)
+            if out is not None:
+                yield out
+        return
+
+    it = iter(records)
+    size = max(1, chunksize)
+    window = workers * 2
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending: Deque[Future] = deque()
+        for batch in iter(lambda: list(islice(it, size)), []):
+            pending.append(pool.submit(_clean_batch, batch))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
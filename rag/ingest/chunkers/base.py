@@ -1,8 +1,10 @@
-# rag/segment/chunker.py
+# rag/ingest/chunkers/base.py
 import logging
 import os
-from functools import lru_cache
-from typing import Dict, Iterable, Iterator, List, Optional
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import lru_cache, partial
+from typing import Deque, Dict, Iterable, Iterator, List, Optional
 
 from transformers import AutoTokenizer, PreTrainedTokenizerBase
 
@@ -23,7 +25,10 @@ DEFAULT_MAX_TOKENS = _coerce_int(os.environ.get("CHUNK_MAX_TOKENS"), 896)
 DEFAULT_OVERLAP = _coerce_int(os.environ.get("CHUNK_OVERLAP"), 128)
 
 
+@lru_cache(maxsize=4)
 def _load_hf_tokenizer(name: str) -> Optional[PreTrainedTokenizerBase]:
+    # Per model name, so a fallback shares the instance a direct request for
+    # that model gets
     try:
         tok = AutoTokenizer.from_pretrained(name, use_fast=True)
     except (ValueError, OSError, RuntimeError):
@@ -33,7 +38,6 @@ def _load_hf_tokenizer(name: str) -> Optional[PreTrainedTokenizerBase]:
     return tok
 
 
-@lru_cache(maxsize=4)
 def get_tokenizer(model_name: Optional[str] = None) -> PreTrainedTokenizerBase:
     """Load and cache a fast tokenizer for chunking text.
 
@@ -45,12 +49,19 @@ def get_tokenizer(model_name: Optional[str] = None) -> PreTrainedTokenizerBase:
     """
     # Check if we should use tiktoken
     use_tiktoken = os.environ.get("USE_TIKTOKEN", "").lower() in ("1", "true", "yes")
-    if use_tiktoken:
+    # Cache on the resolved choice, so get_tokenizer() and
+    # get_tokenizer(<default model>) share one instance, and tiktoken mode
+    # shares one wrapper whatever name is passed
+    return _load_tokenizer(None if use_tiktoken else (model_name or DEFAULT_EMBED_MODEL))
+
+
+@lru_cache(maxsize=4)
+def _load_tokenizer(requested: Optional[str]) -> PreTrainedTokenizerBase:
+    if requested is None:
         from rag.ingest.chunkers.tiktoken_wrapper import TiktokenWrapper
         logger.info("Using OpenAI tiktoken encoder (cl100k_base)")
         return TiktokenWrapper()
 
-    requested = model_name or DEFAULT_EMBED_MODEL
     fallback_env = os.environ.get("CHUNK_TOKENIZER_MODEL")
     fallback_default = "BAAI/bge-small-en-v1.5"
 
@@ -77,6 +88,23 @@ def get_tokenizer(model_name: Optional[str] = None) -> PreTrainedTokenizerBase:
     raise RuntimeError(f"Could not load any tokenizer. Tried: {candidates}")
 
 
+def encode_batch(tokenizer: PreTrainedTokenizerBase, texts: List[str]) -> List[List[int]]:
+    """Token ids for many texts in one tokenizer call (no special tokens).
+
+    Uses the tokenizer's native batch path (HF fast ``__call__`` on a list, or
+    ``encode_batch`` on the tiktoken wrapper) so the whole list crosses into
+    Rust once instead of once per text.
+    """
+    if not texts:
+        return []
+    if hasattr(tokenizer, "encode_batch"):
+        return tokenizer.encode_batch(texts)
+    try:
+        return tokenizer(texts, add_special_tokens=False)["input_ids"]
+    except (TypeError, KeyError):
+        return [tokenizer.encode(t, add_special_tokens=False) for t in texts]
+
+
 def _resolve_char_span(
     offsets: List[tuple[int, int]],
     start_idx: int,
@@ -225,13 +253,31 @@ def chunk_stream(
     overlap: int = DEFAULT_OVERLAP,
     *,
     tokenizer: Optional[PreTrainedTokenizerBase] = None,
+    workers: int = 1,
 ) -> Iterator[Dict]:
+    """Chunk records in input order, tokenizing up to ``workers`` records concurrently.
+
+    Fast tokenizers release the GIL while encoding, so threads scale. Only a
+    bounded window of records is in flight, keeping memory flat on large
+    inputs. Serial by default (``workers=1``). Callers that enable workers
+    should set ``TOKENIZERS_PARALLELISM=false`` so the tokenizer's own Rust
+    thread pool doesn't oversubscribe the cores (app/chunk.py does).
+    """
     tokenizer = tokenizer or get_tokenizer()
-    for rec in records:
-        for chunk in chunk_record(
-            rec,
-            max_tokens=max_tokens,
-            overlap=overlap,
-            tokenizer=tokenizer,
-        ):
-            yield chunk
+    workers = max(1, workers or 1)
+    work = partial(chunk_record, max_tokens=max_tokens, overlap=overlap, tokenizer=tokenizer)
+
+    if workers == 1:
+        for rec in records:
+            yield from work(rec)
+        return
+
+    window = workers * 4
+    with ThreadPoolExecutor(max_workers=workers) as ex:
+        pending: Deque[Future] = deque()
+        for rec in records:
+            pending.append(ex.submit(work, rec))
+            if len(pending) >= window:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
@@ -1,4 +1,4 @@
-# rag/segment/semantic_chunker.py
+# rag/ingest/chunkers/semantic.py
 """
 Semantic chunking that respects document structure.
 Uses LangChain's RecursiveCharacterTextSplitter to preserve semantic boundaries.
@@ -13,6 +13,7 @@ from transformers import PreTrainedTokenizerBase
 from rag.ingest.chunkers.base import (
     DEFAULT_MAX_TOKENS,
     DEFAULT_OVERLAP,
+    encode_batch,
     get_tokenizer,
 )
 
@@ -61,14 +62,22 @@ def chunk_text_semantic(
         "",        # Characters (fallback)
     ]
     
-    # Create splitter with token-aware length function
+    # Create splitter with token-aware length function. The splitter measures
+    # the same pieces (and separators) repeatedly, so counts are memoised for
+    # the lifetime of this document.
+    length_cache: Dict[str, int] = {}
+
     def token_length(text: str) -> int:
         """Count tokens instead of characters."""
-        try:
-            return len(tokenizer.encode(text, add_special_tokens=False))
-        except Exception:
-            # Fallback to character count if tokenization fails
-            return len(text)
+        n = length_cache.get(text)
+        if n is None:
+            try:
+                n = len(tokenizer.encode(text, add_special_tokens=False))
+            except Exception:
+                # Fallback to character count if tokenization fails
+                n = len(text)
+            length_cache[text] = n
+        return n
     
     splitter = RecursiveCharacterTextSplitter(
         chunk_size=max_tokens,
@@ -85,14 +94,19 @@ def chunk_text_semantic(
     if not chunks:
         return
     
+    # Token counts for every final chunk: reuse what the splitter already
+    # measured, and tokenize the rest in a single batch call
+    missing = [c for c in chunks if c not in length_cache]
+    for chunk_text, ids in zip(missing, encode_batch(tokenizer, missing)):
+        length_cache[chunk_text] = len(ids)
+    
     # Convert to format compatible with existing pipeline
     char_offset = 0
     token_offset = 0
     
     for idx, chunk_text in enumerate(chunks):
         # Calculate token boundaries
-        token_ids = tokenizer.encode(chunk_text, add_special_tokens=False)
-        n_tokens = len(token_ids)
+        n_tokens = length_cache[chunk_text]
         
         # Calculate character boundaries
         char_start = char_offset
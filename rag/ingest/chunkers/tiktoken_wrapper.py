@@ -29,6 +29,9 @@ class TiktokenWrapper:
     def encode(self, text: str, add_special_tokens=False):
         return self.encoder.encode(text)
     
+    def encode_batch(self, texts):
+        return self.encoder.encode_ordinary_batch(list(texts))
+    
     def decode(self, tokens):
         return self.encoder.decode(tokens)
     
@@ -4,11 +4,15 @@ Utility to map chunk text to specific line bounding boxes.
 This enables precise deep linking by associating chunks with only their relevant bboxes.
 """
 
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
+import re
 
 logger = logging.getLogger(__name__)
 
+# (line_lower, line_words, long_words, long_words_re, original item) per non-empty line
+_PreparedLine = Tuple[str, frozenset, frozenset, Optional[re.Pattern], Dict]
+
 
 def simplify_polygon(polygon: List[float]) -> List[float]:
     """
@@ -33,10 +37,30 @@ def simplify_polygon(polygon: List[float]) -> List[float]:
     ]
 
 
+def prepare_lines(page_bboxes: List[Dict]) -> List[_PreparedLine]:
+    """
+    Lower-case and split each line of a page once.
+
+    Call once per page and pass the result to find_matching_bboxes(prepared=...)
+    for each of that page's chunks, instead of redoing the work per chunk.
+    """
+    prepared: List[_PreparedLine] = []
+    for bbox_item in page_bboxes:
+        line_text = bbox_item.get("text", "").lower().strip()
+        if not line_text:
+            continue
+        line_words = frozenset(line_text.split())
+        long_words = frozenset(word for word in line_words if len(word) > 3)
+        long_re = re.compile("|".join(map(re.escape, long_words))) if long_words else None
+        prepared.append((line_text, line_words, long_words, long_re, bbox_item))
+    return prepared
+
+
 def find_matching_bboxes(
     chunk_text: str,
     page_bboxes: List[Dict],
-    min_match_ratio: float = 0.3
+    min_match_ratio: float = 0.3,
+    prepared: Optional[List[_PreparedLine]] = None,
 ) -> List[Dict]:
     """
     Find bboxes containing lines that appear in the chunk.
@@ -46,6 +70,8 @@ def find_matching_bboxes(
         chunk_text: The text content of the chunk
         page_bboxes: List of {text, polygon} from Azure parser
         min_match_ratio: Minimum ratio of matching lines to include
+        prepared: prepare_lines(page_bboxes), when mapping several chunks
+            against the same page
         
     Returns:
         List of matching bboxes with simplified [x, y, w, h] format
@@ -58,27 +84,27 @@ def find_matching_bboxes(
     
     matching = []
     
-    for bbox_item in page_bboxes:
-        line_text = bbox_item.get("text", "").lower().strip()
-        if not line_text:
-            continue
-            
+    if prepared is None:
+        prepared = prepare_lines(page_bboxes)
+
+    for line_text, line_words, long_words, long_re, bbox_item in prepared:
         # Check if this line appears in the chunk
         # Use word overlap for fuzzy matching
-        line_words = set(line_text.split())
-        if not line_words:
-            continue
-            
-        # Calculate word overlap
         overlap = len(line_words & chunk_words)
-        overlap_ratio = overlap / len(line_words) if line_words else 0
+        overlap_ratio = overlap / len(line_words)
         
-        # Also check for substring containment
-        is_substring = line_text in chunk_lower or any(
-            word in chunk_lower for word in line_words if len(word) > 3
-        )
+        if overlap_ratio >= min_match_ratio:
+            is_match = True
+        else:
+            # Also check for substring containment: the whole line, or any
+            # longer word inside the chunk (whole-word hits first, then one
+            # alternation pass over the chunk instead of a scan per word)
+            is_match = line_text in chunk_lower or long_re is not None and (
+                not chunk_words.isdisjoint(long_words)
+                or long_re.search(chunk_lower) is not None
+            )
         
-        if overlap_ratio >= min_match_ratio or is_substring:
+        if is_match:
             # Simplify the polygon to [x, y, w, h]
             polygon = bbox_item.get("polygon", [])
             simplified = simplify_polygon(polygon)
@@ -9,14 +9,41 @@ Strategy:
 4. Return ReportMetadata with title, year, project_code, pdf_url
 """
 
+import json
+import os
 import requests
-from bs4 import BeautifulSoup
+from requests.adapters import HTTPAdapter
+from bs4 import BeautifulSoup, SoupStrainer
 import re
-from typing import List, Optional
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from dataclasses import asdict, dataclass
 from urllib.parse import urljoin, unquote
 import time
 
+try:
+    import lxml  # noqa: F401
+    HTML_PARSER = "lxml"
+except ImportError:  # lxml is optional; stdlib parser is slower
+    HTML_PARSER = "html.parser"
+
+# Only materialise the tags each page type actually reads.
+_ANCHORS_ONLY = SoupStrainer("a", href=True)
+_DETAIL_TAGS = SoupStrainer(["h1", "meta", "title", "a"])
+
+# Common non-report pages, unioned into one case-insensitive scan per href
+EXCLUDE_PATTERNS = [
+    "/search", "/categories", "/user", "/node/", "/sites/",
+    "#", "javascript:", "/rss", "/authors", "/subjects",
+    "/contact-us", "/about", "/privacy", "/terms", "/login",
+    "/register", "/help", "/faq"
+]
+_EXCLUDE_RE = re.compile("|".join(map(re.escape, EXCLUDE_PATTERNS)), re.I)
+_REPORT_SLUG_RE = re.compile(r'^/[a-z0-9]+-[a-z0-9-]+$')
+_PROJECT_CODE_RE = re.compile(r'^[A-Z]{2,10}\d{2,6}$')
+_CODE_IN_TEXT_RE = re.compile(r'([A-Z]{2,5}\d{4})')
+_CODE_WORD_RE = re.compile(r'\b([A-Z]{2,5}\d{4})\b')
+
 
 @dataclass
 class ReportMetadata:
@@ -72,22 +99,61 @@ class CRDCScraper:
         2020: "2020+Final+Reports+%28249067%29",
     }
     
-    def __init__(self, timeout: int = 30, user_agent: str = "CRDC-Knowledge-Hub/0.1"):
+    def __init__(self, timeout: int = 30, user_agent: str = "CRDC-Knowledge-Hub/0.1",
+                 detail_workers: int = 4, cache_path: Optional[str] = None):
         self.timeout = timeout
+        # Detail URL -> scraped metadata from earlier runs; re-runs skip the
+        # second-hop fetches (detail + /full page) for anything already known.
+        self.cache_path = cache_path
+        self.detail_cache: Dict[str, dict] = self._load_detail_cache()
+        # Bounded fan-out for detail pages; everything hits one host, so the
+        # worker count doubles as the per-host concurrency limit.
+        self.detail_workers = max(1, detail_workers)
         self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.detail_workers, pool_maxsize=self.detail_workers)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
         self.session.headers.update({"User-Agent": user_agent})
     
+    def _load_detail_cache(self) -> Dict[str, dict]:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return {}
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"[warn] Ignoring unreadable discovery cache {self.cache_path}: {e}")
+            return {}
+    
+    def _save_detail_cache(self) -> None:
+        if not self.cache_path:
+            return
+        os.makedirs(os.path.dirname(self.cache_path) or ".", exist_ok=True)
+        tmp_path = f"{self.cache_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.detail_cache, f, ensure_ascii=False)
+        os.replace(tmp_path, self.cache_path)
+    
     def scrape_years(self, years: List[int], limit: Optional[int] = None) -> List[ReportMetadata]:
         """Scrape reports for specified years."""
+        try:
+            return self._scrape_years(years, limit=limit)
+        finally:
+            self._save_detail_cache()
+    
+    def _scrape_years(self, years: List[int], limit: Optional[int] = None) -> List[ReportMetadata]:
         all_reports = []
         
-        for year in years:
+        for year in dict.fromkeys(years):  # ordered de-dupe
             if year not in self.YEAR_CATEGORIES:
                 print(f"[warn] No category ID for year {year}, skipping")
                 continue
             
             print(f"[info] Scraping {year} Final Reports...")
-            reports = self._scrape_year(year, limit=limit)
+            # Only ask for what is still missing, so later years don't fetch
+            # detail pages that the final truncation would throw away
+            remaining = limit - len(all_reports) if limit else None
+            reports = self._scrape_year(year, limit=remaining)
             all_reports.extend(reports)
             
             if limit and len(all_reports) >= limit:
@@ -116,7 +182,7 @@ class CRDCScraper:
                 print(f"[error] Failed to fetch {url}: {e}")
                 break
             
-            soup = BeautifulSoup(resp.text, "html.parser")
+            soup = BeautifulSoup(resp.text, HTML_PARSER, parse_only=_ANCHORS_ONLY)
             
             # Find report links on this page
             report_links = self._extract_report_links(soup, year)
@@ -134,43 +200,56 @@ class CRDCScraper:
             
             consecutive_empty = 0
             
-            for link in new_links:
+            # Take just enough links to reach the limit; if some detail pages
+            # fail, keep drawing from this page before moving on
+            pending = new_links
+            while pending:
+                batch = pending[:limit - len(reports)] if limit else pending
+                pending = pending[len(batch):]
+                seen_urls.update(batch)
+                reports.extend(self._collect_details(batch, year))
+
                 if limit and len(reports) >= limit:
                     return reports
-                
-                seen_urls.add(link)
-                
-                # Visit Full Details page to get metadata
-                metadata = self._scrape_detail_page(link, year)
-                if metadata:
-                    reports.append(metadata)
-                
-                # Be polite - delay between requests
-                time.sleep(0.5)
             
             page += 1
             time.sleep(1)  # Delay between pages
         
         return reports
     
+    def _collect_details(self, links: List[str], year: int) -> List[ReportMetadata]:
+        """Metadata for each link, in order; links whose detail page fails are dropped."""
+        # Reuse metadata scraped on earlier runs; fetch the rest
+        found = {}
+        to_fetch = []
+        for link in links:
+            cached = self.detail_cache.get(link)
+            if cached:
+                found[link] = ReportMetadata(**cached)
+            else:
+                to_fetch.append(link)
+        
+        # Visit Full Details pages concurrently (order preserved by map)
+        if to_fetch:
+            with ThreadPoolExecutor(max_workers=self.detail_workers) as pool:
+                fetched = pool.map(lambda link: self._scrape_detail_page(link, year), to_fetch)
+                for link, metadata in zip(to_fetch, fetched):
+                    if metadata:
+                        found[link] = metadata
+                        self.detail_cache[link] = asdict(metadata)
+        
+        return [found[link] for link in links if link in found]
+    
     def _extract_report_links(self, soup: BeautifulSoup, year: int) -> List[str]:
         """Extract links to report detail pages from search results."""
-        links = []
-        
-        # Exclude common non-report pages
-        exclude_patterns = [
-            "/search", "/categories", "/user", "/node/", "/sites/", 
-            "#", "javascript:", "/rss", "/authors", "/subjects", 
-            "/contact-us", "/about", "/privacy", "/terms", "/login",
-            "/register", "/help", "/faq"
-        ]
+        links = {}  # ordered set: listings repeat the same report URL per card
         
         # Find all links that look like report pages
         for a in soup.find_all("a", href=True):
             href = a["href"]
             
             # Skip non-report links
-            if any(skip in href.lower() for skip in exclude_patterns):
+            if _EXCLUDE_RE.search(href):
                 continue
             
             # Skip external links
@@ -178,13 +257,11 @@ class CRDCScraper:
                 continue
             
             # Must be a content page URL (slug format with at least one hyphen)
-            if re.match(r'^/[a-z0-9]+-[a-z0-9-]+$', href):
-                full_url = urljoin(self.BASE_URL, href)
-                if full_url not in links:
-                    links.append(full_url)
+            if _REPORT_SLUG_RE.match(href):
+                links.setdefault(urljoin(self.BASE_URL, href), None)
         
         print(f"[debug] Found {len(links)} potential report links")
-        return links
+        return list(links)
     
     def _scrape_detail_page(self, url: str, year: int) -> Optional[ReportMetadata]:
         """Scrape metadata from a report page and its Full Details page."""
@@ -195,7 +272,7 @@ class CRDCScraper:
             print(f"[error] Failed to fetch detail page {url}: {e}")
             return None
         
-        soup = BeautifulSoup(resp.text, "html.parser")
+        soup = BeautifulSoup(resp.text, HTML_PARSER, parse_only=_DETAIL_TAGS)
         
         # Extract title from the ORIGINAL detail page
         title = None
@@ -224,11 +301,17 @@ class CRDCScraper:
             if slug and slug != "full":
                 title = slug.replace("-", " ").title()
         
-        # Find the /node/{id}/full link
+        # One pass over the detail page's anchors: the /node/{id}/full link and
+        # the fallback PDF link (used only if /full doesn't yield one)
         full_details_link = None
+        page_pdf_url = None
         for a in soup.find_all("a", href=True):
-            if "/node/" in a["href"] and "/full" in a["href"]:
-                full_details_link = urljoin(self.BASE_URL, a["href"])
+            href = a["href"]
+            if full_details_link is None and "/node/" in href and "/full" in href:
+                full_details_link = urljoin(self.BASE_URL, href)
+            elif page_pdf_url is None and "/sites/default/files/" in href and ".pdf" in href.lower():
+                page_pdf_url = urljoin(self.BASE_URL, href)
+            if full_details_link and page_pdf_url:
                 break
         
         # Initialize metadata fields
@@ -249,7 +332,7 @@ class CRDCScraper:
             try:
                 resp_full = self.session.get(full_details_link, timeout=self.timeout)
                 resp_full.raise_for_status()
-                soup_full = BeautifulSoup(resp_full.text, "html.parser")
+                soup_full = BeautifulSoup(resp_full.text, HTML_PARSER)
                 
                 # Extract PDF link
                 for a in soup_full.find_all("a", href=True):
@@ -260,7 +343,7 @@ class CRDCScraper:
                 
                 # Parse metadata from the Full Details page
                 # The metadata is in label-value pairs in the page content
-                page_text = soup_full.get_text()
+                page_lines = [line.strip() for line in soup_full.get_text().split('\n') if line.strip()]
                 
                 # Field mapping: label text -> dict key
                 field_map = {
@@ -282,7 +365,7 @@ class CRDCScraper:
                         metadata[key] = field_elem.get_text(strip=True)
                     else:
                         # Fall back to text parsing
-                        value = self._extract_field_value(page_text, label)
+                        value = self._extract_field_value(page_lines, label)
                         if value:
                             metadata[key] = value
                 
@@ -291,11 +374,7 @@ class CRDCScraper:
         
         # If no PDF from /full, try the original page
         if not pdf_url:
-            for a in soup.find_all("a", href=True):
-                href = a["href"]
-                if "/sites/default/files/" in href and ".pdf" in href.lower():
-                    pdf_url = urljoin(self.BASE_URL, href)
-                    break
+            pdf_url = page_pdf_url
         
         if not pdf_url:
             print(f"[warn] No PDF found on {url}")
@@ -305,15 +384,15 @@ class CRDCScraper:
         project_code = metadata.get("project_code")
         if project_code:
             # Validate it looks like a project code (e.g., CRDC2012, CSD2201)
-            if not re.match(r'^[A-Z]{2,10}\d{2,6}$', project_code):
+            if not _PROJECT_CODE_RE.match(project_code):
                 # Try to extract code from it
-                match = re.search(r'([A-Z]{2,5}\d{4})', project_code)
+                match = _CODE_IN_TEXT_RE.search(project_code)
                 if match:
                     project_code = match.group(1)
         
         # If no project code from Alt Title, try extracting from title
         if not project_code and title:
-            match = re.search(r'\b([A-Z]{2,5}\d{4})\b', title)
+            match = _CODE_WORD_RE.search(title)
             if match:
                 project_code = match.group(1)
         
@@ -334,11 +413,8 @@ class CRDCScraper:
             subject=metadata.get("subject"),
         )
     
-    def _extract_field_value(self, text: str, label: str) -> Optional[str]:
-        """Extract field value from page text given a label."""
-        # Split text into lines and find label
-        lines = [line.strip() for line in text.split('\n') if line.strip()]
-        
+    def _extract_field_value(self, lines: List[str], label: str) -> Optional[str]:
+        """Extract field value from the page's non-empty stripped lines given a label."""
         for i, line in enumerate(lines):
             if line == label and i + 1 < len(lines):
                 # The next non-empty line should be the value
@@ -353,7 +429,8 @@ class CRDCScraper:
 
 
 def collect_reports(years: List[int], limit: Optional[int] = None, 
-                    timeout: int = 30, user_agent: str = "CRDC-Knowledge-Hub/0.1") -> List[ReportMetadata]:
+                    timeout: int = 30, user_agent: str = "CRDC-Knowledge-Hub/0.1",
+                    cache_path: Optional[str] = None) -> List[ReportMetadata]:
     """
     Main entry point: Collect CRDC Final Reports for specified years.
     
@@ -362,11 +439,12 @@ def collect_reports(years: List[int], limit: Optional[int] = None,
         limit: Maximum number of reports to collect (None = no limit)
         timeout: Request timeout in seconds
         user_agent: User agent string for requests
+        cache_path: Optional JSON file of detail-page metadata kept across runs
     
     Returns:
         List of ReportMetadata objects
     """
-    scraper = CRDCScraper(timeout=timeout, user_agent=user_agent)
+    scraper = CRDCScraper(timeout=timeout, user_agent=user_agent, cache_path=cache_path)
     return scraper.scrape_years(years, limit=limit)
 
 
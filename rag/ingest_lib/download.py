@@ -3,13 +3,43 @@
 PDF downloader with clean filename handling.
 """
 
-import requests
+import hashlib
+import json
+import os
+import tempfile
+import threading
 import time
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional, Union
+from typing import Dict, Iterable, Iterator, Optional, Tuple, Union
 from urllib.parse import unquote
 import re
 
+# Connection pool sized to cover the download worker count, so parallel
+# fetches reuse keep-alive connections instead of re-handshaking TLS.
+POOL_SIZE = 32
+# Downloads all hit one host, so keep concurrency polite by default
+DEFAULT_WORKERS = 4
+CHUNK_SIZE = 1 << 16
+
+# Failures while streaming the body, which urllib3's Retry never sees
+_BODY_ERRORS = (
+    requests.exceptions.ChunkedEncodingError,
+    requests.exceptions.ConnectionError,
+    requests.exceptions.Timeout,
+)
+
+# Per-directory sidecar: url -> {etag, last_modified, sha12, path}
+CACHE_FILE = ".download_cache.json"
+_CACHES: Dict[str, Dict[str, dict]] = {}
+_SHA_PATHS: Dict[str, Dict[str, str]] = {}  # dir -> sha12 -> path
+_DIRTY: set = set()  # dirs with entries not yet written to the sidecar
+_CACHE_LOCK = threading.Lock()
+
 # Import for type hints
 try:
     from .discover import ReportMetadata
@@ -33,16 +63,92 @@ def sanitize_filename(name: str) -> str:
     return safe
 
 
+@lru_cache(maxsize=None)
+def _session(attempts: int = 3, backoff: float = 2) -> requests.Session:
+    """Shared Session (one per retry policy) with retries handled by urllib3."""
+    retry = Retry(
+        total=max(0, attempts - 1),  # `total` counts retries, not attempts
+        backoff_factor=backoff,
+        status_forcelist=(429, 500, 502, 503, 504),
+        allowed_methods=frozenset({"GET", "HEAD"}),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=retry)
+    session = requests.Session()
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def _cache_key(download_dir: str) -> str:
+    return str(Path(download_dir).resolve())
+
+
+def _load_cache(download_dir: str) -> Dict[str, dict]:
+    """Return the (memoised) download cache for a directory."""
+    key = _cache_key(download_dir)
+    with _CACHE_LOCK:
+        if key not in _CACHES:
+            cache_path = Path(download_dir) / CACHE_FILE
+            try:
+                _CACHES[key] = json.loads(cache_path.read_text(encoding="utf-8"))
+            except (OSError, ValueError):
+                _CACHES[key] = {}
+            _SHA_PATHS[key] = {
+                e["sha12"]: e["path"] for e in _CACHES[key].values() if e.get("sha12") and e.get("path")
+            }
+        return _CACHES[key]
+
+
+def _save_cache(download_dir: str, url: str, entry: dict, flush: bool = True) -> None:
+    """Record one entry; with flush=False the sidecar is written later by flush_download_cache."""
+    cache = _load_cache(download_dir)
+    key = _cache_key(download_dir)
+    with _CACHE_LOCK:
+        cache[url] = entry
+        _SHA_PATHS[key][entry["sha12"]] = entry["path"]
+        _DIRTY.add(key)
+    if flush:
+        flush_download_cache(download_dir)
+
+
+def flush_download_cache(download_dir: str) -> None:
+    """Rewrite a directory's sidecar atomically if it has unsaved entries."""
+    key = _cache_key(download_dir)
+    with _CACHE_LOCK:
+        if key not in _DIRTY:
+            return
+        cache_path = Path(download_dir) / CACHE_FILE
+        tmp_path = cache_path.with_suffix(".tmp")
+        tmp_path.write_text(json.dumps(_CACHES[key], indent=1), encoding="utf-8")
+        os.replace(tmp_path, cache_path)
+        _DIRTY.discard(key)
+
+
+def _path_for_sha(download_dir: str, sha12: str) -> Optional[str]:
+    """Existing file already holding these bytes, if any."""
+    _load_cache(download_dir)
+    with _CACHE_LOCK:
+        path = _SHA_PATHS[_cache_key(download_dir)].get(sha12)
+    return path if path and os.path.exists(path) else None
+
+
 def download_pdf(
     source: Union[str, "ReportMetadata"], 
     download_dir: str, 
     timeout: int = 30, 
     user_agent: str = "CRDC-Knowledge-Hub/0.1", 
     attempts: int = 3, 
-    backoff: int = 2
+    backoff: int = 2,
+    flush_cache: bool = True,
 ) -> Optional[str]:
     """
     Download a PDF and save with a clean filename.
+
+    A URL seen before is revalidated with a conditional GET (ETag /
+    Last-Modified) only when its target filename is missing but the cached
+    file for that URL still exists under another name; an existing target
+    is skipped without any request.
     
     Args:
         source: Either a URL string or a ReportMetadata object
@@ -50,7 +156,9 @@ def download_pdf(
         timeout: Request timeout in seconds
         user_agent: User agent for requests
         attempts: Number of retry attempts
-        backoff: Backoff multiplier for retries
+        backoff: Backoff factor for retries
+        flush_cache: Write the download-cache sidecar now (download_many
+            defers this and flushes once at the end)
     
     Returns:
         Path to downloaded file, or None if download failed
@@ -77,36 +185,144 @@ def download_pdf(
         print(f"[skip] Already exists: {filename}")
         return str(out_path)
     
-    # Download with retries
-    for attempt in range(attempts):
+    # Known URL saved under another name: revalidate with a conditional GET
+    # so unchanged PDFs cost one 304 instead of a full body transfer.
+    cached = _load_cache(download_dir).get(url)
+    if cached and os.path.exists(cached.get("path", "")):
+        if cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+
+    # Connect errors and retryable statuses are retried by the session's
+    # urllib3 Retry policy; errors while streaming the body are retried here
+    session = _session(attempts, backoff)
+    attempts = max(1, attempts)
+    for attempt in range(1, attempts + 1):
+        resp = None
         try:
             print(f"[download] {filename}...")
-            resp = requests.get(url, headers=headers, timeout=timeout, stream=True)
+            resp = session.get(url, headers=headers, timeout=timeout, stream=True)
+            if resp.status_code == 304 and cached:
+                resp.close()
+                print(f"[skip] Not modified: {filename}")
+                return cached["path"]
             resp.raise_for_status()
-            
-            with open(out_path, "wb") as f:
-                for chunk in resp.iter_content(chunk_size=8192):
-                    f.write(chunk)
-            
-            print(f"[success] Saved: {filename}")
-            return str(out_path)
-            
         except Exception as e:
-            print(f"[warn] Download failed (attempt {attempt + 1}/{attempts}): {e}")
-            if attempt < attempts - 1:
-                sleep_time = backoff * (attempt + 1)
-                print(f"[retry] Waiting {sleep_time}s before retry...")
-                time.sleep(sleep_time)
-    
+            if resp is not None:
+                resp.close()
+            print(f"[warn] Download failed: {e}")
+            break
+
+        # Closing releases the pooled connection even when the body fails
+        try:
+            with resp:
+                tmp_name, sha12 = _stream_to_temp(resp, download_dir)
+        except _BODY_ERRORS as e:
+            print(f"[warn] Download interrupted (attempt {attempt}/{attempts}): {e}")
+            if attempt < attempts:
+                time.sleep(backoff * attempt)
+            continue
+        except Exception as e:
+            print(f"[warn] Download failed: {e}")
+            break
+
+        try:
+            _place(tmp_name, out_path, _path_for_sha(download_dir, sha12))
+        except Exception as e:
+            print(f"[warn] Could not save {filename}: {e}")
+            break
+
+        _save_cache(download_dir, url, {
+            "etag": resp.headers.get("ETag"),
+            "last_modified": resp.headers.get("Last-Modified"),
+            "sha12": sha12,
+            "path": str(out_path),
+        }, flush=flush_cache)
+        print(f"[success] Saved: {filename} (sha256 {sha12})")
+        return str(out_path)
+
     print(f"[error] Failed to download: {url}")
     return None
 
 
+def _stream_to_temp(resp: requests.Response, download_dir: str) -> Tuple[str, str]:
+    """
+    Stream the body into a temp file in the target dir, hashing as we go.
+
+    The caller's final os.replace is atomic, so a crash or a concurrent
+    download of the same name never leaves a truncated PDF behind that the
+    exists() check would later treat as complete. Returns (temp path, sha12).
+    """
+    h = hashlib.sha256()
+    tmp = tempfile.NamedTemporaryFile(dir=download_dir, suffix=".part", delete=False)
+    try:
+        with tmp:
+            for chunk in resp.iter_content(chunk_size=CHUNK_SIZE):
+                h.update(chunk)
+                tmp.write(chunk)
+    except BaseException:
+        if os.path.exists(tmp.name):
+            os.unlink(tmp.name)
+        raise
+    return tmp.name, h.hexdigest()[:12]
+
+
+def _place(tmp_name: str, out_path: Path, same_bytes: Optional[str]) -> None:
+    """Move a finished download into place, hard-linking identical content."""
+    try:
+        if out_path.exists():
+            os.unlink(tmp_name)
+        elif same_bytes:
+            # Identical content under another URL/name: share one file
+            try:
+                os.link(same_bytes, out_path)
+                os.unlink(tmp_name)
+            except OSError:
+                os.replace(tmp_name, out_path)
+        else:
+            os.replace(tmp_name, out_path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+
+
+def download_many(
+    sources: Iterable[Union[str, "ReportMetadata"]],
+    download_dir: str,
+    timeout: int = 30,
+    user_agent: str = "CRDC-Knowledge-Hub/0.1",
+    attempts: int = 3,
+    backoff: int = 2,
+    max_workers: int = DEFAULT_WORKERS,
+) -> Iterator[Tuple[Union[str, "ReportMetadata"], Optional[str]]]:
+    """
+    Download many PDFs concurrently over the shared session.
+
+    Yields (source, path) pairs in completion order; path is None on failure.
+    The download-cache sidecar is written once, after the last download.
+    """
+    try:
+        with ThreadPoolExecutor(max_workers=max(1, max_workers)) as pool:
+            futures = {
+                pool.submit(
+                    download_pdf, src, download_dir, timeout, user_agent, attempts, backoff, flush_cache=False
+                ): src
+                for src in sources
+            }
+            for fut in as_completed(futures):
+                yield futures[fut], fut.result()
+    finally:
+        flush_download_cache(download_dir)
+
+
 def download_reports(
     reports: list,
     download_dir: str,
     timeout: int = 30,
-    user_agent: str = "CRDC-Knowledge-Hub/0.1"
+    user_agent: str = "CRDC-Knowledge-Hub/0.1",
+    max_workers: int = DEFAULT_WORKERS,
 ) -> list:
     """
     Download multiple reports.
@@ -116,23 +332,20 @@ def download_reports(
         download_dir: Directory to save PDFs
         timeout: Request timeout
         user_agent: User agent string
+        max_workers: Number of concurrent downloads
     
     Returns:
         List of successfully downloaded file paths
     """
-    downloaded = []
-    
-    for report in reports:
-        path = download_pdf(
-            source=report,
+    paths = {
+        id(src): path
+        for src, path in download_many(
+            reports,
             download_dir=download_dir,
             timeout=timeout,
-            user_agent=user_agent
+            user_agent=user_agent,
+            max_workers=max_workers,
         )
-        if path:
-            downloaded.append(path)
-        
-        # Be polite
-        time.sleep(0.5)
-    
-    return downloaded
+    }
+    # Preserve input order in the returned list
+    return [paths[id(r)] for r in reports if paths.get(id(r))]
@@ -1,22 +1,46 @@
 # rag/ingest_lib/parse_pdf.py
-from typing import Dict, Any
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Any, List, Tuple
 from dataclasses import dataclass, field
 
+# Below this many pages a process pool costs more than it saves.
+PARALLEL_MIN_PAGES = 32
+
 @dataclass
 class ParsedDoc:
     text: str
     meta: Dict[str, Any] = field(default_factory=dict)
 
-def parse_pdf(pdf_path: str, extra_meta: Dict[str, Any] = None) -> ParsedDoc:
+def _extract_range(args: Tuple[str, int, int]) -> List[str]:
+    """Worker: open the PDF independently and extract pages [start, stop)."""
+    from pypdf import PdfReader
+    pdf_path, start, stop = args
+    reader = PdfReader(pdf_path)
+    return [reader.pages[i].extract_text() or "" for i in range(start, stop)]
+
+
+def parse_pdf(pdf_path: str, extra_meta: Dict[str, Any] = None, workers: int = 1) -> ParsedDoc:
     """
     Default PDF parser using pypdf if available.
+
+    Serial by default. With workers > 1, large PDFs are split into contiguous
+    page ranges and extracted across a process pool (each worker reopens the
+    file); results are reassembled in page order.
     """
     text = ""
     try:
         from pypdf import PdfReader
         reader = PdfReader(pdf_path)
-        for page in reader.pages:
-            text += page.extract_text() + "\n"
+        n_pages = len(reader.pages)
+        if workers > 1 and n_pages >= PARALLEL_MIN_PAGES:
+            step = -(-n_pages // workers)
+            ranges = [(str(pdf_path), i, min(i + step, n_pages)) for i in range(0, n_pages, step)]
+            with ProcessPoolExecutor(max_workers=workers) as ex:
+                page_texts = [t for part in ex.map(_extract_range, ranges) for t in part]
+        else:
+            # Single pass over pages; image-only pages come back as None/"".
+            page_texts = [page.extract_text() or "" for page in reader.pages]
+        text = "".join(f"{t}\n" for t in page_texts)
     except ImportError:
         print("[warn] pypdf not installed, skipping text extraction for default parser")
         text = "Text extraction unavailable (install pypdf)"
@@ -1,7 +1,7 @@
 # rag/ingest_lib/parser_azure.py
 import os
 from typing import Dict, Any, List, Optional
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from azure.ai.documentintelligence import DocumentIntelligenceClient
 from azure.core.credentials import AzureKeyCredential
 
@@ -80,6 +80,7 @@ class AzureParser:
                 bboxes=lines_data
             )
             
-            pages_output.append(asdict(page_obj))
+            # Shallow copy: asdict() deep-copies every bbox/polygon list per page
+            pages_output.append(dict(vars(page_obj)))
             
         return pages_output
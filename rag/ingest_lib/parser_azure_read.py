@@ -9,7 +9,7 @@ Cost: $1.50 per 1,000 pages (same as layout, but simpler API)
 """
 import os
 from typing import Dict, Any, List
-from dataclasses import dataclass, field, asdict
+from dataclasses import dataclass, field
 from azure.ai.documentintelligence import DocumentIntelligenceClient
 from azure.core.credentials import AzureKeyCredential
 
@@ -92,6 +92,7 @@ class AzureReadParser:
                 height=page.height
             )
             
-            pages_output.append(asdict(page_obj))
+            # Shallow copy; asdict() recursively deep-copies every field
+            pages_output.append(dict(vars(page_obj)))
             
         return pages_output
@@ -4,11 +4,20 @@ import csv
 from typing import List, Dict, Any
 from pathlib import Path
 
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json is the fallback
+    orjson = None
+
 def write_jsonl(records: List[Dict[str, Any]], path: str):
     Path(path).parent.mkdir(parents=True, exist_ok=True)
+    if orjson is not None:
+        opts = orjson.OPT_APPEND_NEWLINE | orjson.OPT_NON_STR_KEYS
+        with open(path, "wb") as f:
+            f.writelines(orjson.dumps(rec, option=opts) for rec in records)
+        return
     with open(path, "w", encoding="utf-8") as f:
-        for rec in records:
-            f.write(json.dumps(rec) + "\n")
+        f.writelines(json.dumps(rec) + "\n" for rec in records)
 
 def write_csv(records: List[Dict[str, Any]], path: str):
     Path(path).parent.mkdir(parents=True, exist_ok=True)
@@ -31,6 +31,9 @@ def create_evaluate_node(llm_model: str = "gpt-4o-mini"):
     
     Uses a fast model to verify the answer is grounded in sources.
     """
+    # Built once per graph rather than per evaluation
+    evaluator_llm = ChatOpenAI(model=llm_model, temperature=0)
+    structured_evaluator = evaluator_llm.with_structured_output(HallucinationCheck)
     
     def evaluate_node(state: RAGState) -> Dict[str, Any]:
         """
@@ -57,9 +60,6 @@ def create_evaluate_node(llm_model: str = "gpt-4o-mini"):
             for i, doc in enumerate(documents[:6])
         ])
         
-        evaluator_llm = ChatOpenAI(model=llm_model, temperature=0)
-        structured_evaluator = evaluator_llm.with_structured_output(HallucinationCheck)
-        
         try:
             result = structured_evaluator.invoke([
                 ("system", """You are a fact-checker verifying that an AI-generated answer is grounded in source documents.
@@ -30,6 +30,9 @@ def create_grade_node(llm_model: str = "gpt-4o-mini"):
     
     Uses a fast, cheap model (gpt-4o-mini) for grading to minimize cost.
     """
+    # Built once per graph so rewrite -> retrieve -> grade retries reuse the client
+    grader_llm = ChatOpenAI(model=llm_model, temperature=0)
+    structured_grader = grader_llm.with_structured_output(RelevanceGrade)
     
     def grade_node(state: RAGState) -> Dict[str, Any]:
         """
@@ -49,10 +52,6 @@ def create_grade_node(llm_model: str = "gpt-4o-mini"):
                 "timings": state.get("timings", []) + [{"stage": "grade", "seconds": 0}],
             }
         
-        # Use structured output for reliable grading
-        grader_llm = ChatOpenAI(model=llm_model, temperature=0)
-        structured_grader = grader_llm.with_structured_output(RelevanceGrade)
-        
         grades: List[float] = []
         relevant_count = 0
         
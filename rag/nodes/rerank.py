@@ -103,10 +103,11 @@ def create_rerank_node(reranker: Any):
             logger.error(f"[rerank] failed: {e}")
             reranked = hits
         
-        # Convert back to documents
+        # Convert back to documents. Each hit's metadata is the private copy
+        # made above, so it is reused in place rather than copied again.
         reranked_docs: List[Document] = []
         for hit in reranked[:k]:
-            md = dict(hit.get("metadata", {}) or {})
+            md = hit.get("metadata") or {}
             text = md.pop("text", "") or md.get("preview", "")
             
             # Preserve rerank scores
@@ -66,12 +66,16 @@ def create_retrieve_node(retriever: Any):
             documents: List[Document] = []
             for doc in raw_documents:
                 content = doc.page_content or ""
-                md = dict(doc.metadata) if doc.metadata else {}
+                # Metadata is only read here (the rerank node takes its own
+                # copy), so documents are passed through without copying it
+                md = doc.metadata or {}
                 
-                # If page_content is empty, try to get from metadata
-                if not content.strip():
-                    content = md.get("preview") or md.get("text") or ""
+                if content.strip():
+                    documents.append(doc)
+                    continue
                 
+                # If page_content is empty, try to get from metadata
+                content = md.get("preview") or md.get("text") or ""
                 if content.strip():
                     documents.append(Document(page_content=content, metadata=md))
                 else:
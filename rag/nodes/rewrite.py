@@ -30,6 +30,9 @@ def create_rewrite_node(llm_model: str = "gpt-4o-mini"):
     
     Uses a fast model to rewrite vague or poorly-performing queries.
     """
+    # Built once per graph and reused across rewrite attempts
+    rewriter_llm = ChatOpenAI(model=llm_model, temperature=0.3)
+    structured_rewriter = rewriter_llm.with_structured_output(RewrittenQuery)
     
     def rewrite_node(state: RAGState) -> Dict[str, Any]:
         """
@@ -51,9 +54,6 @@ def create_rewrite_node(llm_model: str = "gpt-4o-mini"):
             for doc in documents[:3]
         ]) if documents else "(no documents retrieved)"
         
-        rewriter_llm = ChatOpenAI(model=llm_model, temperature=0.3)
-        structured_rewriter = rewriter_llm.with_structured_output(RewrittenQuery)
-        
         try:
             result = structured_rewriter.invoke([
                 ("system", """You are a search query optimizer for an agricultural research database about cotton farming.
@@ -8,6 +8,7 @@ convert retrieval outputs into chat model inputs.
 from __future__ import annotations
 
 import json
+from functools import lru_cache
 from typing import Any, Dict, List, Optional
 
 from langchain_core.documents import Document
@@ -15,7 +16,7 @@ from langchain_core.prompts import ChatPromptTemplate
 from pydantic import BaseModel, Field, ValidationError
 
 # Import persona system from app.services.prompting
-from app.services.prompting import get_system_prompt, DEFAULT_PERSONA, allows_general_knowledge
+from app.services.prompting import get_system_prompt, resolve_persona, DEFAULT_PERSONA, allows_general_knowledge
 
 SYSTEM_PROMPT = (
     "You are an expert research assistant for the Cotton Research and Development Corporation (CRDC). "
@@ -222,6 +223,20 @@ def prepare_prompt_state(data: Dict[str, Any]) -> Dict[str, Any]:
     }
 
 
+@lru_cache(maxsize=8)
+def _chat_prompt_for(persona: str) -> ChatPromptTemplate:
+    """Compile the chat template once per known persona so the static prefix is reused."""
+    return ChatPromptTemplate.from_messages(
+        [
+            ("system", get_system_prompt(persona)),
+            (
+                "human",
+                "{instructions}\n\nQuestion:\n{question}\n\nSource Passages:\n{sources_block}\n\n{format_instructions}",
+            ),
+        ]
+    )
+
+
 def build_prompt_messages(state: Dict[str, Any]):
     """Build chat prompt messages, using persona-specific system prompt if provided."""
     format_instructions = state.get("format_instructions", STRUCTURED_FORMAT_INSTRUCTIONS)
@@ -231,20 +246,11 @@ def build_prompt_messages(state: Dict[str, Any]):
             f"{format_instructions}\nAvailable citation IDs: {', '.join(citation_ids)}"
         )
     
-    # Get persona-specific system prompt
-    persona = state.get("persona") or DEFAULT_PERSONA
-    system_prompt = get_system_prompt(persona)
-    
-    # Build dynamic chat prompt template with persona-specific system prompt
-    chat_prompt = ChatPromptTemplate.from_messages(
-        [
-            ("system", system_prompt),
-            (
-                "human",
-                "{instructions}\n\nQuestion:\n{question}\n\nSource Passages:\n{sources_block}\n\n{format_instructions}",
-            ),
-        ]
-    )
+    # Resolved before the cache lookup so client-supplied strings can't grow it
+    persona = resolve_persona(state.get("persona") or DEFAULT_PERSONA)
+
+    # Persona-specific template, compiled once per persona
+    chat_prompt = _chat_prompt_for(persona)
     
     prompt_value = chat_prompt.invoke(
         {
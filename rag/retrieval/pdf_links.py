@@ -8,16 +8,28 @@ from typing import Any, Dict, Optional
 PDF_ROOT = Path(os.environ.get("PDF_ROOT", "data/raw")).resolve()
 
 
+# doc_id -> filename for PDFs found on disk. Only hits are memoised, so a
+# PDF ingested while the API is running is picked up on its next lookup
+_RESOLVED: Dict[str, str] = {}
+_RESOLVED_MAX = 8192
+
+
 def _default_filename(doc_id: str) -> Optional[str]:
     """Return `<doc_id>.pdf` if that file exists under the PDF root."""
     if not doc_id:
         return None
+    cached = _RESOLVED.get(doc_id)
+    if cached:
+        return cached
     candidate = (PDF_ROOT / f"{doc_id}.pdf").resolve()
     try:
         candidate.relative_to(PDF_ROOT)
     except ValueError:
         return None
     if candidate.exists():
+        if len(_RESOLVED) >= _RESOLVED_MAX:
+            _RESOLVED.clear()
+        _RESOLVED[doc_id] = candidate.name
         return candidate.name
     return None
 
@@ -41,29 +53,32 @@ def get_pdf_filename(doc_id: str) -> Optional[str]:
     return None
 
 
+def _format_pdf_url(filename: str, page: Optional[int]) -> str:
+    base = f"/api/pdf/{filename}"
+    if page is None:
+        return base
+    return f"{base}#page={max(1, int(page))}"
+
+
 def build_pdf_url(doc_id: str, page: Optional[int] = None, filename: Optional[str] = None) -> Optional[str]:
-    """Construct the served PDF URL for a document id."""
+    """
+    Construct the served PDF URL for a document id.
+
+    Pass an already-resolved `filename` to skip the doc_id lookup.
+    """
     if not doc_id:
         return None
-    
     if not filename:
         filename = get_pdf_filename(doc_id)
-        
-    if not filename:
-        return None
-        
-    if filename:
-        base = f"/api/pdf/{filename}"
-    else:
-        base = f"/pdf/by-id/{doc_id}"
-        
-    if page is None:
-        return base
-    page_num = max(1, int(page))
-    return f"{base}#page={page_num}"
+        if not filename:
+            return None
+    return _format_pdf_url(filename, page)
 
 
 def _coerce_page(page: Any) -> Optional[int]:
+    if type(page) is int:
+        # Common case (already-normalised page numbers): skip the generic path
+        return page if page >= 1 else 1
     if isinstance(page, list) and page:
         page = page[0]
     if page in (None, "", []):
@@ -85,7 +100,9 @@ def enrich_metadata(meta: Dict[str, Any]) -> Dict[str, Any]:
     # Filename might already be in meta (from SQLite JOIN)
     filename = meta.get("filename")
     if not filename:
-        filename = get_pdf_filename(doc_id) or _default_filename(doc_id)
+        # Memoised per doc_id once found: repeat hits from the same document
+        # (within and across queries) skip the Path.resolve() + stat() calls
+        filename = get_pdf_filename(doc_id)
     
     if filename:
         meta.setdefault("filename", filename)
@@ -98,8 +115,9 @@ def enrich_metadata(meta: Dict[str, Any]) -> Dict[str, Any]:
     if page is not None:
         meta["page"] = page
 
-    pdf_url = build_pdf_url(doc_id, page, filename)
-    if pdf_url:
-        meta["url"] = pdf_url
+    # filename is already resolved above; without one there is no URL to
+    # build, so don't send build_pdf_url back through the lookup
+    if filename:
+        meta["url"] = _format_pdf_url(filename, page)
 
     return meta
@@ -5,28 +5,71 @@ Keeps neighbour stitching, keyword/year filtering, and preview construction cons
 
 from __future__ import annotations
 
-from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
+from functools import lru_cache
 import json
+import re
+import sys
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
 
 from rag.retrieval.pdf_links import enrich_metadata
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # optional speedup; stdlib json (which also takes bytes) is the fallback
+    _loads = json.loads
+
+
+_CHUNK_ID_RE = re.compile(r"(.*)_chunk(\d+)")
+# Line breaks/tabs -> spaces for previews; 1:1 in length, so text can be
+# truncated before it is translated
+_PREVIEW_WS = str.maketrans("\r\n\t", "   ")
+
+
+@lru_cache(maxsize=65536)
+def _doc_id_from_chunk_id(chunk_id: str) -> str:
+    """Derive doc_id from `{doc_id}_chunk{N}` or `{doc_id}_p{page}_{index}` ids (fallback only)."""
+    m = _CHUNK_ID_RE.fullmatch(chunk_id)
+    if m:
+        return m.group(1)
+    if "_p" in chunk_id:
+        return chunk_id.rsplit("_p", 1)[0]
+    return chunk_id
+
 
-def neighbor_ids(chunk_id: str, neighbors: int) -> List[str]:
-    """Return a list of neighbour chunk IDs ±N around chunk_id (expects suffix `_chunkNNNN`)."""
+@lru_cache(maxsize=65536)
+def neighbor_ids(chunk_id: str, neighbors: int) -> Tuple[str, ...]:
+    """
+    Return neighbour chunk IDs ±N around chunk_id (expects suffix `_chunkNNNN`).
+
+    Memoised: each hit is expanded once for the metadata prefetch and again
+    for stitching, and popular chunks recur across queries.
+    """
     if neighbors <= 0:
-        return [chunk_id]
-    base, _, tail = chunk_id.partition("_chunk")
-    try:
-        idx = int(tail)
-    except ValueError:
-        return [chunk_id]
-    ids: List[str] = []
-    for j in range(idx - neighbors, idx + neighbors + 1):
-        ids.append(f"{base}_chunk{j:04d}")
-    return ids
+        return (chunk_id,)
+    m = _CHUNK_ID_RE.fullmatch(chunk_id)
+    if not m:
+        return (chunk_id,)
+    idx = int(m.group(2))
+    prefix = m.group(1) + "_chunk"
+    return tuple([f"{prefix}{j:04d}" for j in range(idx - neighbors, idx + neighbors + 1)])
+
+
+def neighbor_ids_bulk(chunk_ids: Iterable[str], neighbors: int) -> Set[str]:
+    """Union of the ±N neighbour IDs of every chunk in chunk_ids, excluding the chunks themselves."""
+    centres = set(chunk_ids)
+    if neighbors <= 0:
+        return set()
+    out: Set[str] = set()
+    for chunk_id in centres:
+        out.update(neighbor_ids(chunk_id, neighbors))
+    out -= centres
+    return out
 
 
 def load_lookup(chunks_path: str | Path, needed_ids: Iterable[str]) -> Dict[str, Dict]:
@@ -37,12 +80,12 @@ def load_lookup(chunks_path: str | Path, needed_ids: Iterable[str]) -> Dict[str,
         return lookup
 
     needed = set(needed_ids)
-    with path.open(encoding="utf-8") as f:
+    # Binary lines go straight to the parser: no per-line decode/strip copy
+    with path.open("rb") as f:
         for line in f:
-            line = line.strip()
-            if not line:
+            if not line.strip():
                 continue
-            rec = json.loads(line)
+            rec = _loads(line)
             cid = rec.get("id")
             if cid in needed:
                 lookup[cid] = rec
@@ -51,6 +94,19 @@ def load_lookup(chunks_path: str | Path, needed_ids: Iterable[str]) -> Dict[str,
     return lookup
 
 
+@lru_cache(maxsize=128)
+def _keyword_pattern(keywords: Tuple[str, ...]) -> "re.Pattern[str]":
+    """
+    Compile a contains-any keyword list into one case-insensitive alternation.
+
+    One regex pass over the raw text replaces a lower() copy plus one
+    substring scan per keyword; longest keywords go first so overlapping
+    terms don't shadow each other.
+    """
+    ordered = sorted(set(keywords), key=len, reverse=True)
+    return re.compile("|".join(re.escape(kw) for kw in ordered), re.IGNORECASE)
+
+
 def passes_filters(
     rec: Dict,
     contains_any: Optional[List[str]] = None,
@@ -58,10 +114,10 @@ def passes_filters(
     year_max: Optional[int] = None,
 ) -> bool:
     """Apply keyword and year filters to a chunk record."""
-    contains_any = contains_any or []
     if contains_any:
-        text = (rec.get("text") or rec.get("preview") or "").lower()
-        if not any(kw in text for kw in contains_any):
+        text = rec.get("text") or rec.get("preview") or ""
+        keywords = contains_any if isinstance(contains_any, tuple) else tuple(contains_any)
+        if not _keyword_pattern(keywords).search(text):
             return False
 
     year = rec.get("year")
@@ -94,7 +150,7 @@ def stitch_preview(
     if not chunk_id:
         return (center_rec.get("text") or "")[:max_chars]
 
-    doc_id = center_rec.get("doc_id") or chunk_id.split("_chunk")[0]
+    doc_id = center_rec.get("doc_id") or _doc_id_from_chunk_id(chunk_id)
     parts: List[str] = []
     total_len = 0
 
@@ -102,35 +158,36 @@ def stitch_preview(
         rec = lookup.get(nid)
         if not rec:
             continue
-        rec_doc = rec.get("doc_id") or nid.split("_chunk")[0]
+        rec_doc = rec.get("doc_id") or _doc_id_from_chunk_id(nid)
         if rec_doc != doc_id:
             continue
-        txt = (rec.get("text") or "").replace("\n", " ").strip()
+        txt = (rec.get("text") or "").strip()
         if not txt:
             continue
         if no_truncate:
-            parts.append(txt)
+            parts.append(txt.translate(_PREVIEW_WS))
             continue
-        room = max_chars - total_len
+        # total_len counts the joining spaces too, so the joined preview never
+        # exceeds max_chars and needs no final slice
+        sep = 1 if parts else 0
+        room = max_chars - total_len - sep
         if room <= 0:
             break
         if len(txt) <= room:
-            parts.append(txt)
-            total_len += len(txt)
+            parts.append(txt.translate(_PREVIEW_WS))
+            total_len += sep + len(txt)
         else:
-            parts.append(txt[:room])
-            total_len += room
+            parts.append(txt[:room].translate(_PREVIEW_WS))
             break
 
     if not parts:
-        return ((center_rec.get("text") or "").replace("\n", " "))[:max_chars]
-    joined = " ".join(parts)
-    return joined if no_truncate else joined[:max_chars]
+        return (center_rec.get("text") or "")[:max_chars].translate(_PREVIEW_WS)
+    return " ".join(parts)
 
 
-@dataclass
+@dataclass(frozen=True)
 class RetrievalSettings:
-    contains: List[str]
+    contains: Tuple[str, ...]
     year_min: Optional[int]
     year_max: Optional[int]
     neighbors: int
@@ -140,9 +197,37 @@ class RetrievalSettings:
     diversify_per_doc: bool
 
 
+def _freeze(value: Any) -> Any:
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, (set, frozenset)):
+        return frozenset(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for k, v in value.items()))
+    return value
+
+
 def resolve_retrieval_settings(filters: Optional[Dict[str, Any]]) -> RetrievalSettings:
-    """Normalise filter inputs from API or config into a structured settings object."""
-    filters = filters or {}
+    """
+    Normalise filter inputs from API or config into a structured settings object.
+
+    Results are memoised on a frozen copy of `filters`; the returned settings
+    are immutable, so repeat requests with the same filters share one object.
+    """
+    try:
+        key = tuple(sorted((k, _freeze(v)) for k, v in (filters or {}).items()))
+        hash(key)
+    except TypeError:  # unhashable/unorderable filter values: resolve uncached
+        return _resolve_retrieval_settings(filters or {})
+    return _resolve_frozen(key)
+
+
+@lru_cache(maxsize=128)
+def _resolve_frozen(key: Tuple[Tuple[str, Any], ...]) -> RetrievalSettings:
+    return _resolve_retrieval_settings(dict(key))
+
+
+def _resolve_retrieval_settings(filters: Dict[str, Any]) -> RetrievalSettings:
 
     def _to_int(value, *, default: Optional[int] = None, minimum: Optional[int] = None) -> Optional[int]:
         if value is None or value == "":
@@ -158,18 +243,14 @@ def resolve_retrieval_settings(filters: Optional[Dict[str, Any]]) -> RetrievalSe
     raw_contains = filters.get("contains")
     if isinstance(raw_contains, str):
         contains = [s.strip().lower() for s in raw_contains.split(",") if s.strip()]
-    elif isinstance(raw_contains, (list, tuple, set)):
+    elif isinstance(raw_contains, (list, tuple, set, frozenset)):
         contains = [str(s).strip().lower() for s in raw_contains if str(s).strip()]
     else:
         contains = []
 
-    # Deduplicate while preserving order
-    seen = set()
-    unique_contains: List[str] = []
-    for kw in contains:
-        if kw not in seen:
-            seen.add(kw)
-            unique_contains.append(kw)
+    # Deduplicate while preserving order; interned so the per-hit pattern
+    # cache lookup in passes_filters compares keywords by identity
+    unique_contains = tuple(sys.intern(kw) for kw in dict.fromkeys(contains))
 
     year_min = _to_int(filters.get("year_min"))
     year_max = _to_int(filters.get("year_max"))
@@ -196,14 +277,123 @@ def resolve_retrieval_settings(filters: Optional[Dict[str, Any]]) -> RetrievalSe
     )
 
 
+# Per-id get_metadata fallback: fan out above this many ids, on a shared,
+# bounded pool so concurrent requests can't swamp a remote store
+METADATA_FANOUT_MIN = 4
+METADATA_FANOUT_WORKERS = 16
+
+
+@lru_cache(maxsize=1)
+def _metadata_pool() -> ThreadPoolExecutor:
+    return ThreadPoolExecutor(max_workers=METADATA_FANOUT_WORKERS, thread_name_prefix="meta-fetch")
+
+
+def _prefetch_metadata(
+    hits: Sequence[Dict[str, Any]],
+    store: Any,
+    lookup: Dict[str, Dict[str, Any]],
+    neighbors: int,
+) -> None:
+    """
+    Fill `lookup` with the records needed for `hits`, in one batched call.
+
+    Wanted ids are the union over `hits` of: the hit itself when it arrived
+    without text/metadata, plus its ±neighbors (pass neighbors=0 to fetch
+    centre records only). Stores without
+    `get_metadata_batch` fall back to per-id `get_metadata`.
+    """
+    wanted: Dict[str, None] = {}
+    centres: List[str] = []
+    for hit in hits:
+        md = hit.get("metadata", {}) if isinstance(hit, dict) else {}
+        chunk_id = md.get("id") or hit.get("id")
+        if not chunk_id:
+            continue
+        centres.append(chunk_id)
+        if chunk_id not in lookup and not (hit.get("text") or md.get("text")):
+            wanted[chunk_id] = None
+    for nid in neighbor_ids_bulk(centres, neighbors):
+        if nid not in lookup:
+            wanted[nid] = None
+    if not wanted:
+        return
+
+    ids = list(wanted)
+    if hasattr(store, "get_metadata_batch"):
+        try:
+            batch = store.get_metadata_batch(ids)  # type: ignore[attr-defined]
+            if batch:
+                lookup.update(batch)
+        except Exception:
+            pass
+    elif hasattr(store, "get_metadata"):
+        def _fetch(nid: str) -> Optional[Dict[str, Any]]:
+            try:
+                return store.get_metadata(nid)  # type: ignore[attr-defined]
+            except Exception:
+                return None
+
+        # Single-key stores are usually I/O bound: overlap the round-trips
+        if len(ids) > METADATA_FANOUT_MIN:
+            results = _metadata_pool().map(_fetch, ids)
+        else:
+            results = map(_fetch, ids)
+        for nid, extra in zip(ids, results):
+            if extra:
+                lookup[nid] = extra
+
+
+_NO_YEAR = np.iinfo(np.int64).min
+
+
+def _hit_year(hit: Dict[str, Any], lookup: Dict[str, Dict[str, Any]]) -> int:
+    md = hit.get("metadata") if isinstance(hit, dict) else None
+    md = md if isinstance(md, dict) else {}
+    if "year" in md:
+        year = md["year"]
+    else:
+        year = (lookup.get(md.get("id") or hit.get("id")) or {}).get("year")
+    try:
+        return int(year)
+    except (TypeError, ValueError):
+        return _NO_YEAR
+
+
+def _year_mask(
+    hits: Sequence[Dict[str, Any]],
+    lookup: Dict[str, Dict[str, Any]],
+    year_min: Optional[int],
+    year_max: Optional[int],
+) -> np.ndarray:
+    """
+    Boolean keep-mask for the year filter over all hits in one vectorised pass.
+
+    Mirrors passes_filters: hits whose year is missing or unparseable are kept.
+    """
+    years = np.fromiter((_hit_year(hit, lookup) for hit in hits), dtype=np.int64, count=len(hits))
+    keep = np.ones(len(hits), dtype=bool)
+    if year_min is not None:
+        keep &= years >= year_min
+    if year_max is not None:
+        keep &= years <= year_max
+    keep |= years == _NO_YEAR
+    return keep
+
+
 def prepare_hits(
     hits: Sequence[Dict[str, Any]],
     store: Any,
     settings: RetrievalSettings,
     *,
     limit: Optional[int] = None,
+    prefiltered: bool = False,
 ) -> List[Dict[str, Any]]:
-    """Apply filters, per-doc limits, and neighbour stitching to a list of raw FAISS hits."""
+    """
+    Apply filters, per-doc limits, and neighbour stitching to a list of raw FAISS hits.
+
+    Pass `prefiltered=True` when the store already applied the year/contains
+    filters in its query; the per-hit re-check is then skipped.
+    """
     if not hits:
         return []
 
@@ -214,40 +404,46 @@ def prepare_hits(
         except Exception:
             lookup = {}
 
-    per_doc_counts = defaultdict(int)
-    processed: List[Dict[str, Any]] = []
-
-    for hit in hits:
+    # Pass 1 needs only the centre records of hits that arrived without text
+    _prefetch_metadata(hits, store, lookup, 0)
+
+    # Year filter over every candidate at once, so rejected hits skip the
+    # merge + enrich_metadata work below
+    candidates: Sequence[Dict[str, Any]] = hits
+    if not prefiltered and (settings.year_min is not None or settings.year_max is not None):
+        keep = _year_mask(hits, lookup, settings.year_min, settings.year_max)
+        candidates = [hits[i] for i in np.flatnonzero(keep)]
+
+    contains = settings.contains
+    # Per-doc cap; it can only bind when fewer slots than candidates exist
+    per_doc_cap = settings.per_doc if settings.diversify_per_doc else 0
+    if per_doc_cap >= len(candidates):
+        per_doc_cap = 0
+    per_doc_counts: Dict[str, int] = {}
+    accepted: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+
+    # Pass 1: cheap merge/filter/per-doc cap; stop once `limit` hits survive
+    for hit in candidates:
         md = hit.get("metadata", {}) if isinstance(hit, dict) else {}
         chunk_id = md.get("id") or hit.get("id")
         if not chunk_id:
             continue
 
-        if chunk_id not in lookup and hasattr(store, "get_metadata"):
-            try:
-                extra = store.get_metadata(chunk_id)  # type: ignore[attr-defined]
-            except Exception:
-                extra = None
-            if extra:
-                lookup[chunk_id] = extra
-
         # Start with original hit metadata (includes bboxes from Postgres query)
-        original_md = hit.get("metadata", {}) if isinstance(hit, dict) else {}
-        base_meta = lookup.get(chunk_id, {})
-        # Merge: base_meta first, then original_md (so original data takes precedence)
-        meta = dict(base_meta) if isinstance(base_meta, dict) else {}
-        if isinstance(original_md, dict):
-            meta.update(original_md)  # original_md (with bboxes) overrides lookup
+        original_md = md if isinstance(md, dict) else {}
+        base_meta = lookup.get(chunk_id)
+        # Merge: base_meta first, then original_md (so original data takes
+        # precedence) as a single fresh dict; lookup records are shared, so
+        # they are never mutated in place
+        if isinstance(base_meta, dict) and base_meta:
+            meta = {**base_meta, **original_md}
+        else:
+            meta = dict(original_md)
         meta["id"] = chunk_id
-        # Handle both formats: {doc_id}_chunk{N} and {doc_id}_p{page}_{index}
-        doc_id = meta.get("doc_id")
-        if not doc_id:
-            if "_chunk" in chunk_id:
-                doc_id = chunk_id.split("_chunk")[0]
-            elif "_p" in chunk_id:
-                doc_id = chunk_id.rsplit("_p", 1)[0]
-            else:
-                doc_id = chunk_id
+        # Prefer the explicit column the store returns (Postgres hits carry
+        # doc_id at the top level, not in the JSONB metadata); parse the id
+        # only as a last resort
+        doc_id = meta.get("doc_id") or hit.get("doc_id") or _doc_id_from_chunk_id(chunk_id)
         meta["doc_id"] = doc_id
 
         title = meta.get("title") or meta.get("doc_title") or doc_id or chunk_id
@@ -259,46 +455,42 @@ def prepare_hits(
             except ValueError:
                 meta["year"] = year_val
 
-        meta = enrich_metadata(meta)
-
-        if not passes_filters(meta, settings.contains, settings.year_min, settings.year_max):
-            continue
-
-        # IMPORTANT: Copy text from hit to metadata (Postgres returns it at hit["text"])
+        # IMPORTANT: Copy text from hit to metadata (Postgres returns it at hit["text"]);
+        # before filtering, so the contains filter sees it
         raw_text = hit.get("text") or ""
         if raw_text and not meta.get("text"):
             meta["text"] = raw_text
 
-        if settings.diversify_per_doc and settings.per_doc > 0 and per_doc_counts[doc_id] >= settings.per_doc:
+        if not prefiltered and not passes_filters(meta, contains, settings.year_min, settings.year_max):
             continue
 
-        # Pre-fetch neighbors if needed for stitching
-        if settings.neighbors > 0:
-            nids = neighbor_ids(chunk_id, settings.neighbors)
-            missing_nids = [nid for nid in nids if nid not in lookup]
-            
-            if missing_nids:
-                if hasattr(store, "get_metadata_batch"):
-                    try:
-                        batch = store.get_metadata_batch(missing_nids)
-                        if batch:
-                            lookup.update(batch)
-                    except Exception:
-                        pass
-                elif hasattr(store, "get_metadata"):
-                    # Fallback to single fetch
-                    for nid in missing_nids:
-                        try:
-                            extra = store.get_metadata(nid)
-                            if extra:
-                                lookup[nid] = extra
-                        except Exception:
-                            pass
-
-        preview_lookup = lookup if lookup else {chunk_id: meta}
+        if per_doc_cap > 0:
+            seen = per_doc_counts.get(doc_id, 0)
+            if seen >= per_doc_cap:
+                continue
+            per_doc_counts[doc_id] = seen + 1
+
+        # Only survivors pay for the filename lookup / URL build
+        meta = enrich_metadata(meta)
+
+        # The hit's own record isn't prefetched when it arrived with text, so
+        # make sure the centre chunk is available to the stitcher
+        lookup.setdefault(chunk_id, meta)
+        accepted.append((hit, meta))
+        if limit is not None and len(accepted) >= limit:
+            break
+
+    # Neighbours are fetched (one batch) and stitched only for survivors
+    if settings.neighbors > 0:
+        _prefetch_metadata([hit for hit, _ in accepted], store, lookup, settings.neighbors)
+
+    # Pass 2: stitch previews and normalise scores
+    processed: List[Dict[str, Any]] = []
+    for hit, meta in accepted:
+        chunk_id = meta["id"]
         preview = stitch_preview(
             meta,
-            preview_lookup,
+            lookup,
             neighbors=settings.neighbors,
             max_chars=settings.max_preview_chars,
         )
@@ -326,11 +518,6 @@ def prepare_hits(
             "cosine": faiss_score,
             "metadata": meta,
         })
-        if settings.diversify_per_doc and settings.per_doc > 0:
-            per_doc_counts[doc_id] += 1
-
-        if limit is not None and len(processed) >= limit:
-            break
 
     return processed
 
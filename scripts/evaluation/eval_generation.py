@@ -15,6 +15,12 @@ import os
 from pathlib import Path
 from typing import Any, Dict, List
 
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # optional speedup; stdlib json is the fallback
+    _loads = json.loads
+
 # Load env vars for API keys
 from dotenv import load_dotenv
 load_dotenv()
@@ -53,7 +59,7 @@ def load_queries(path: str) -> List[Dict[str, Any]]:
             if not line:
                 continue
             try:
-                obj = json.loads(line)
+                obj = _loads(line)
             except json.JSONDecodeError:
                 continue
             if "query" not in obj or "gold_answer" not in obj:
@@ -12,10 +12,18 @@ from __future__ import annotations
 import argparse
 import json
 import math
+from concurrent.futures import ThreadPoolExecutor
 from copy import deepcopy
-from typing import Dict, Iterable, List, Sequence, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Sequence, Tuple
 
 import app.factory as factory
+from app.ports import EmbedderPort
+
+try:
+    import orjson
+    _loads = orjson.loads
+except ImportError:  # optional speedup; stdlib json is the fallback
+    _loads = json.loads
 
 
 def parse_args() -> argparse.Namespace:
@@ -27,6 +35,12 @@ def parse_args() -> argparse.Namespace:
         help="Path to JSONL file with evaluation queries.",
     )
     parser.add_argument("--k", type=int, default=6, help="Top-k depth for metrics.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Queries evaluated concurrently (default 1 = serial; higher values can hit LLM rate limits).",
+    )
     return parser.parse_args()
 
 
@@ -38,7 +52,7 @@ def load_queries(path: str) -> List[Dict[str, object]]:
             if not line:
                 continue
             try:
-                obj = json.loads(line)
+                obj = _loads(line)
             except json.JSONDecodeError:
                 continue
             if "query" not in obj or "gold_doc_ids" not in obj:
@@ -88,13 +102,65 @@ def mrr_at_k(preds: Sequence[str], gold: Iterable[str], k: int) -> float:
     return 0.0
 
 
+def _memoise(fn: Callable[..., Any], cache: Dict[str, Any]) -> Callable[..., Any]:
+    """Return `fn` with results cached on its arguments (objects keyed by identity)."""
+
+    def wrapper(*args: Any, **kwargs: Any) -> Any:
+        key = json.dumps([args, kwargs], sort_keys=True, default=lambda obj: f"<{id(obj)}>")
+        if key not in cache:
+            cache[key] = fn(*args, **kwargs)
+        return cache[key]
+
+    return wrapper
+
+
+class PrecomputedQueryEmbedder(EmbedderPort):
+    """Serve embed_query() from vectors computed up front in batched requests."""
+
+    def __init__(self, inner: EmbedderPort) -> None:
+        self.inner = inner
+        self._vectors: Dict[str, List[float]] = {}
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "inner":
+            raise AttributeError(name)
+        return getattr(self.inner, name)
+
+    def prime(self, texts: Iterable[str]) -> None:
+        """Embed every not-yet-seen text; the adapter batches the request."""
+        todo = [t for t in dict.fromkeys(texts) if t and t not in self._vectors]
+        if todo:
+            self._vectors.update(zip(todo, self.inner.embed_texts(todo)))
+
+    def embed_query(self, text: str) -> List[float]:
+        vec = self._vectors.get(text)
+        return vec if vec is not None else self.inner.embed_query(text)
+
+    def embed_texts(self, texts: List[str]) -> List[List[float]]:
+        return self.inner.embed_texts(texts)
+
+
+# Embedders and stores built for one orchestrator variant, reused by the next:
+# both variants share the embedding client and the Postgres connection pool
+_SHARED: Dict[str, Dict[str, Any]] = {"embedder": {}, "store": {}}
+
+
 def _build_pipeline(cfg_path: str, cfg_dict: Dict[str, object]) -> object:
     original_loader = factory._load_cfg  # type: ignore[attr-defined]
+    original_embedder = factory.load_embedder
+    original_store = factory.PostgresStoreAdapter
     try:
         factory._load_cfg = lambda _: deepcopy(cfg_dict)  # type: ignore[attr-defined]
+        factory.load_embedder = _memoise(
+            lambda *a, **kw: PrecomputedQueryEmbedder(original_embedder(*a, **kw)),
+            _SHARED["embedder"],
+        )
+        factory.PostgresStoreAdapter = _memoise(original_store, _SHARED["store"])
         return factory.build_pipeline(cfg_path)
     finally:
         factory._load_cfg = original_loader  # type: ignore[attr-defined]
+        factory.load_embedder = original_embedder
+        factory.PostgresStoreAdapter = original_store
 
 
 def normalize_id(doc_id: str) -> str:
@@ -113,16 +179,16 @@ def evaluate_pipeline(
     k: int,
     per_doc: int,
     max_tokens: int,
+    workers: int = 1,
 ) -> Dict[str, float]:
     ndcg_scores: List[float] = []
     recall_scores: List[float] = []
     mrr_scores: List[float] = []
 
-    for entry in queries:
+    def predict(entry: Dict[str, object]) -> Tuple[List[str], bool]:
         question = str(entry.get("query") or "").strip()
-        gold_raw = entry.get("gold_doc_ids") if isinstance(entry, dict) else []
-        gold_doc_ids: List[str] = [normalize_id(str(gid)) for gid in gold_raw] if isinstance(gold_raw, list) else []
         preds: List[str] = []
+        failed = False
         if question:
             try:
                 result = pipeline.ask(  # type: ignore[attr-defined]
@@ -134,6 +200,7 @@ def evaluate_pipeline(
                 )
             except Exception:
                 result = {}
+                failed = True
             sources = result.get("sources") if isinstance(result, dict) else None
             if isinstance(sources, list):
                 for citation in sources[:k]:
@@ -144,7 +211,22 @@ def evaluate_pipeline(
                 
                 # Deduplicate preds while preserving order
                 preds = list(dict.fromkeys(preds))
-
+        return preds, failed
+
+    # Each ask() is dominated by network round-trips (embedding, Postgres,
+    # LLM), so queries are issued concurrently; results keep query order
+    if workers > 1 and len(queries) > 1:
+        with ThreadPoolExecutor(max_workers=workers) as ex:
+            results = list(ex.map(predict, queries))
+    else:
+        results = [predict(entry) for entry in queries]
+
+    # Failed ask() calls still score as misses (as in the serial baseline),
+    # but are counted so rate-limit noise is visible in the summary
+    failed = sum(1 for _, err in results if err)
+    for entry, (preds, _) in zip(queries, results):
+        gold_raw = entry.get("gold_doc_ids") if isinstance(entry, dict) else []
+        gold_doc_ids: List[str] = [normalize_id(str(gid)) for gid in gold_raw] if isinstance(gold_raw, list) else []
         ndcg_scores.append(ndcg_at_k(preds, gold_doc_ids, k))
         recall_scores.append(recall_at_k(preds, gold_doc_ids, k))
         mrr_scores.append(mrr_at_k(preds, gold_doc_ids, k))
@@ -156,6 +238,7 @@ def evaluate_pipeline(
         "ndcg": _mean(ndcg_scores),
         "recall": _mean(recall_scores),
         "mrr": _mean(mrr_scores),
+        "failed": failed,
     }
 
 
@@ -199,15 +282,22 @@ def main() -> None:
                 "ndcg": 0.0,
                 "recall": 0.0,
                 "mrr": 0.0,
+                "failed": len(queries),
             }
             continue
 
+        # One batched embedding pass over the gold questions instead of one
+        # request per ask(); the vectors are reused by later variants too
+        for embedder in _SHARED["embedder"].values():
+            embedder.prime(str(entry.get("query") or "").strip() for entry in queries)
+
         metrics = evaluate_pipeline(
             pipeline,
             queries,
             k=k,
             per_doc=per_doc,
             max_tokens=max_tokens,
+            workers=max(1, args.workers),
         )
         summaries[key] = metrics
 
@@ -2,12 +2,13 @@
 """
 Re-embed existing chunks with a new embedding model.
 This script:
-1. Reads all existing chunks from PostgreSQL
-2. Re-embeds them with text-embedding-3-large (3072 dims)
-3. Updates the embeddings in-place (recreates table with new vector size)
+1. Moves the existing chunks table aside as a backup
+2. Streams its rows back in batches and re-embeds them with text-embedding-3-large (3072 dims)
+3. Inserts them into a recreated table with the new vector size
 
 Usage:
     python scripts/reembed_chunks.py
+    VECTOR_TYPE=halfvec python scripts/reembed_chunks.py   # fp16 storage
 
 Cost estimate: ~$0.05 for 1000 chunks
 """
@@ -15,6 +16,14 @@ Cost estimate: ~$0.05 for 1000 chunks
 import os
 import json
 import sys
+
+try:  # optional: faster metadata serialisation
+    import orjson
+
+    def _dumps(obj) -> str:
+        return orjson.dumps(obj).decode("utf-8")
+except ImportError:
+    _dumps = json.dumps
 from dotenv import load_dotenv
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import sessionmaker
@@ -27,6 +36,12 @@ NEW_DIM = 3072
 NEW_MODEL = "text-embedding-3-large"
 TABLE_NAME = "chunks"
 BATCH_SIZE = 100
+# "halfvec" stores fp16 (half the size; HNSW-indexable above 2000 dims).
+# Must match vector_store.vector_type in the runtime config.
+VECTOR_TYPE = os.environ.get("VECTOR_TYPE", "vector").lower()
+# Parallel workers / memory for the HNSW build after the load
+INDEX_BUILD_WORKERS = int(os.environ.get("INDEX_BUILD_WORKERS", "4"))
+INDEX_BUILD_MEM = os.environ.get("INDEX_BUILD_MEM", "1GB")
 
 
 def main():
@@ -43,6 +58,10 @@ def main():
     # --- Load embedder ---
     print(f"🔧 Loading embedder: {NEW_MODEL}")
     from app.adapters.loader import load_embedder
+    from app.adapters.vector_postgres import VECTOR_TYPES, _vector_literal
+    if VECTOR_TYPE not in VECTOR_TYPES:
+        print(f"❌ Unknown VECTOR_TYPE '{VECTOR_TYPE}'. Expected one of: {', '.join(VECTOR_TYPES)}")
+        sys.exit(1)
     embed_cfg = {"provider": "openai", "model": NEW_MODEL}
     embedder = load_embedder(embed_cfg, os.environ)
     
@@ -55,34 +74,13 @@ def main():
         print("Nothing to re-embed. Exiting.")
         return
     
-    # --- Read all chunks ---
-    print("📖 Reading existing chunks...")
-    result = session.execute(text(f"""
-        SELECT id, doc_id, chunk_index, page_number, text, metadata
-        FROM {TABLE_NAME}
-        ORDER BY id
-    """))
-    
-    chunks = []
-    for row in result:
-        chunks.append({
-            "id": row.id,
-            "doc_id": row.doc_id,
-            "chunk_index": row.chunk_index,
-            "page_number": row.page_number,
-            "text": row.text,
-            "metadata": row.metadata
-        })
-    
-    print(f"   Loaded {len(chunks)} chunks")
-    
     # --- Backup: rename old table ---
     print("💾 Backing up old table...")
     session.execute(text(f"ALTER TABLE IF EXISTS {TABLE_NAME} RENAME TO {TABLE_NAME}_backup_1536"))
     session.commit()
     
     # --- Create new table with 3072 dims ---
-    print(f"🔨 Creating new table with {NEW_DIM} dimensions...")
+    print(f"🔨 Creating new table with {NEW_DIM} dimensions ({VECTOR_TYPE})...")
     session.execute(text("CREATE EXTENSION IF NOT EXISTS vector"))
     session.execute(text(f"""
         CREATE TABLE {TABLE_NAME} (
@@ -91,30 +89,32 @@ def main():
             chunk_index INTEGER,
             page_number INTEGER,
             text TEXT,
-            embedding vector({NEW_DIM}),
+            embedding {VECTOR_TYPE}({NEW_DIM}),
             metadata JSONB,
             search_vector tsvector,
             created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
         )
     """))
     
-    # Create indexes
-    session.execute(text(f"""
-        CREATE INDEX IF NOT EXISTS {TABLE_NAME}_embedding_idx 
-        ON {TABLE_NAME} USING hnsw (embedding vector_cosine_ops)
-    """))
-    session.execute(text(f"""
-        CREATE INDEX IF NOT EXISTS {TABLE_NAME}_search_vector_idx 
-        ON {TABLE_NAME} USING gin (search_vector)
-    """))
     session.commit()
     print("   ✅ New table created")
     
     # --- Re-embed in batches ---
-    print(f"🚀 Re-embedding {len(chunks)} chunks in batches of {BATCH_SIZE}...")
+    # Rows stream from the backup table through a server-side cursor on a
+    # separate connection, so only one batch is held in memory at a time
+    # (and the write session's commits don't close the cursor)
+    print(f"🚀 Re-embedding {total_chunks} chunks in batches of {BATCH_SIZE}...")
+    n_batches = (total_chunks + BATCH_SIZE - 1) // BATCH_SIZE
+    
+    read_conn = engine.connect().execution_options(stream_results=True, yield_per=BATCH_SIZE)
+    result = read_conn.execute(text(f"""
+        SELECT id, doc_id, chunk_index, page_number, text, metadata
+        FROM {TABLE_NAME}_backup_1536
+        ORDER BY id
+    """))
     
-    for i in range(0, len(chunks), BATCH_SIZE):
-        batch = chunks[i:i+BATCH_SIZE]
+    for batch_no, rows in enumerate(result.partitions(BATCH_SIZE), start=1):
+        batch = [row._mapping for row in rows]
         texts = [c["text"] for c in batch]
         
         # Embed
@@ -122,7 +122,7 @@ def main():
         
         # Insert
         for chunk, emb in zip(batch, embeddings):
-            meta_json = json.dumps(chunk["metadata"]) if isinstance(chunk["metadata"], dict) else chunk["metadata"]
+            meta_json = _dumps(chunk["metadata"]) if isinstance(chunk["metadata"], dict) else chunk["metadata"]
             
             session.execute(text(f"""
                 INSERT INTO {TABLE_NAME} (id, doc_id, chunk_index, page_number, text, embedding, metadata, search_vector)
@@ -133,12 +133,31 @@ def main():
                 "chunk_index": chunk["chunk_index"],
                 "page_number": chunk["page_number"],
                 "text": chunk["text"],
-                "embedding": str(emb),
+                "embedding": _vector_literal(emb),
                 "metadata": meta_json
             })
         
         session.commit()
-        print(f"   ✅ Batch {i//BATCH_SIZE + 1}/{(len(chunks) + BATCH_SIZE - 1)//BATCH_SIZE}: {len(batch)} chunks")
+        print(f"   ✅ Batch {batch_no}/{n_batches}: {len(batch)} chunks")
+    
+    read_conn.close()
+    
+    # --- Build indexes on the loaded table ---
+    # One bulk HNSW build (parallel, in memory) is far cheaper than growing
+    # the graph row by row during the inserts above
+    print(f"🔨 Building indexes ({INDEX_BUILD_WORKERS} workers, {INDEX_BUILD_MEM})...")
+    session.execute(text(f"SET maintenance_work_mem = '{INDEX_BUILD_MEM}'"))
+    session.execute(text(f"SET max_parallel_maintenance_workers = {INDEX_BUILD_WORKERS}"))
+    session.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS {TABLE_NAME}_embedding_idx 
+        ON {TABLE_NAME} USING hnsw (embedding {VECTOR_TYPES[VECTOR_TYPE]})
+    """))
+    session.execute(text(f"""
+        CREATE INDEX IF NOT EXISTS {TABLE_NAME}_search_vector_idx 
+        ON {TABLE_NAME} USING gin (search_vector)
+    """))
+    session.commit()
+    print("   ✅ Indexes built")
     
     # --- Verify ---
     result = session.execute(text(f"SELECT COUNT(*) FROM {TABLE_NAME}"))
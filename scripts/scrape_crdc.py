@@ -85,6 +85,18 @@ def main():
         action='store_true',
         help='Preview what would be downloaded without downloading'
     )
+    parser.add_argument(
+        '--workers',
+        type=int,
+        default=4,
+        help='Concurrent PDF downloads (default: 4)'
+    )
+    parser.add_argument(
+        '--discover-cache',
+        type=str,
+        default='data/metadata/.discover_cache.json',
+        help="Detail-page metadata cache reused across runs ('' to disable)"
+    )
     parser.add_argument(
         '--metadata-csv',
         type=str,
@@ -107,7 +119,8 @@ def main():
     print("\n[Step 1] Discovering reports...")
     reports = collect_reports(
         years=args.years,
-        limit=args.limit
+        limit=args.limit,
+        cache_path=args.discover_cache or None
     )
     
     print(f"\n[info] Found {len(reports)} reports")
@@ -134,7 +147,8 @@ def main():
         print(f"\n[Step 2] Downloading {len(reports)} PDFs to {args.output}...")
         downloaded = download_reports(
             reports=reports,
-            download_dir=args.output
+            download_dir=args.output,
+            max_workers=args.workers
         )
         print(f"\n[done] Downloaded {len(downloaded)} / {len(reports)} files")
     
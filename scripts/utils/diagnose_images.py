@@ -1,5 +1,6 @@
 import sys
 import logging
+from functools import lru_cache
 from pathlib import Path
 from docling.document_converter import DocumentConverter, PdfFormatOption
 from docling.datamodel.base_models import InputFormat
@@ -9,22 +10,25 @@ from docling.datamodel.pipeline_options import PdfPipelineOptions
 logging.basicConfig(level=logging.INFO, format='%(message)s')
 logger = logging.getLogger(__name__)
 
-def diagnose_pdf(pdf_path):
-    print(f"\n🔍 Diagnosing: {pdf_path}")
-    
+@lru_cache(maxsize=1)
+def get_converter():
+    """Build the OCR/table pipeline once; its models stay loaded across PDFs."""
     # Configure pipeline
     pipeline_options = PdfPipelineOptions()
     pipeline_options.do_ocr = True
     pipeline_options.do_table_structure = True
     
-    converter = DocumentConverter(
+    return DocumentConverter(
         format_options={
             InputFormat.PDF: PdfFormatOption(pipeline_options=pipeline_options)
         }
     )
+
+def diagnose_pdf(pdf_path):
+    print(f"\n🔍 Diagnosing: {pdf_path}")
     
     try:
-        result = converter.convert(str(pdf_path))
+        result = get_converter().convert(str(pdf_path))
         doc = result.document
         
         print("\n📊 Element Analysis:")
@@ -52,7 +56,8 @@ def diagnose_pdf(pdf_path):
 
 if __name__ == "__main__":
     if len(sys.argv) < 2:
-        print("Usage: python diagnose_images.py <path_to_pdf>")
+        print("Usage: python diagnose_images.py <path_to_pdf> [<path_to_pdf> ...]")
         sys.exit(1)
     
-    diagnose_pdf(sys.argv[1])
+    for pdf_path in sys.argv[1:]:
+        diagnose_pdf(pdf_path)
@@ -0,0 +1,203 @@
+from __future__ import annotations
+
+from pathlib import Path
+import sys
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.insert(0, str(ROOT))
+
+from rag.retrieval.utils import prepare_hits, resolve_retrieval_settings, stitch_preview
+
+
+def _rec(chunk_id: str, doc_id: str, text: str, year=None) -> dict:
+    rec = {"id": chunk_id, "doc_id": doc_id, "text": text, "title": doc_id.upper()}
+    if year is not None:
+        rec["year"] = year
+    return rec
+
+
+class FakeStore:
+    def __init__(self, records):
+        self.meta = {rec["id"]: rec for rec in records}
+
+    def get_meta_map(self):
+        return self.meta
+
+    def get_metadata(self, chunk_id: str):
+        return self.meta.get(chunk_id)
+
+
+RECORDS = [
+    _rec("docA_chunk0000", "docA", "Irrigation scheduling trial.", 2023),
+    _rec("docA_chunk0001", "docA", "Soil moisture probes in irrigation.", 2023),
+    _rec("docA_chunk0002", "docA", "Yield results by irrigation block.", 2023),
+    _rec("docB_chunk0000", "docB", "Banana fibre blends.", 2022),
+    _rec("docC_chunk0000", "docC", "Historical irrigation practices.", 2010),
+    _rec("docD_chunk0000", "docD", "Undated irrigation field notes."),
+    _rec("docE_chunk0000", "docE", "Water use efficiency review.", "2021"),
+]
+
+
+def _hits(*ids, score=0.9):
+    by_id = {rec["id"]: rec for rec in RECORDS}
+    return [
+        {"id": cid, "score": score - i * 0.01, "metadata": dict(by_id[cid])}
+        for i, cid in enumerate(ids)
+    ]
+
+
+def _ids(results):
+    return [r["id"] for r in results]
+
+
+def test_prefiltered_matches_unfiltered_when_store_already_filtered():
+    store = FakeStore(RECORDS)
+    settings = resolve_retrieval_settings(
+        {"contains": "irrigation", "year_min": 2020, "neighbors": 0, "per_doc": 0}
+    )
+    hits = _hits("docA_chunk0001", "docD_chunk0000", "docA_chunk0000")
+
+    filtered = prepare_hits(hits, store, settings)
+    prefiltered = prepare_hits(hits, store, settings, prefiltered=True)
+
+    assert _ids(filtered) == _ids(prefiltered) == ["docA_chunk0001", "docD_chunk0000", "docA_chunk0000"]
+    assert [r["metadata"]["preview"] for r in filtered] == [r["metadata"]["preview"] for r in prefiltered]
+    assert [r["score"] for r in filtered] == [r["score"] for r in prefiltered]
+
+
+def test_prefiltered_skips_the_per_hit_filter_recheck():
+    store = FakeStore(RECORDS)
+    settings = resolve_retrieval_settings(
+        {"contains": "irrigation", "year_min": 2020, "neighbors": 0, "per_doc": 0}
+    )
+    hits = _hits("docA_chunk0000", "docB_chunk0000", "docC_chunk0000")
+
+    assert _ids(prepare_hits(hits, store, settings)) == ["docA_chunk0000"]
+    assert _ids(prepare_hits(hits, store, settings, prefiltered=True)) == [
+        "docA_chunk0000",
+        "docB_chunk0000",
+        "docC_chunk0000",
+    ]
+
+
+def test_contains_filter_sees_text_that_only_arrives_on_the_hit():
+    store = FakeStore([])
+    settings = resolve_retrieval_settings({"contains": "banana", "neighbors": 0, "per_doc": 0})
+    hits = [
+        {"id": "docB_chunk0000", "score": 0.8, "text": "Banana fibre blends.", "metadata": {"id": "docB_chunk0000"}},
+        {"id": "docA_chunk0000", "score": 0.7, "text": "Irrigation scheduling.", "metadata": {"id": "docA_chunk0000"}},
+    ]
+
+    results = prepare_hits(hits, store, settings)
+
+    assert _ids(results) == ["docB_chunk0000"]
+    assert results[0]["metadata"]["text"] == "Banana fibre blends."
+
+
+def test_year_bounds_are_inclusive_and_keep_undated_hits():
+    store = FakeStore(RECORDS)
+    hits = _hits(
+        "docA_chunk0000",  # 2023
+        "docB_chunk0000",  # 2022
+        "docC_chunk0000",  # 2010
+        "docD_chunk0000",  # no year
+        "docE_chunk0000",  # "2021"
+    )
+
+    def run(**bounds):
+        settings = resolve_retrieval_settings({"neighbors": 0, "per_doc": 0, **bounds})
+        return _ids(prepare_hits(hits, store, settings))
+
+    assert run() == _ids(hits)
+    assert run(year_min=2021, year_max=2022) == ["docB_chunk0000", "docD_chunk0000", "docE_chunk0000"]
+    assert run(year_min=2023) == ["docA_chunk0000", "docD_chunk0000"]
+    assert run(year_max=2010) == ["docC_chunk0000", "docD_chunk0000"]
+
+
+def test_year_string_is_coerced_on_output():
+    store = FakeStore(RECORDS)
+    settings = resolve_retrieval_settings({"neighbors": 0, "per_doc": 0})
+
+    results = prepare_hits(_hits("docE_chunk0000"), store, settings)
+
+    assert results[0]["metadata"]["year"] == 2021
+
+
+def test_per_doc_cap_binding_keeps_first_hits_per_doc_in_order():
+    store = FakeStore(RECORDS)
+    settings = resolve_retrieval_settings({"neighbors": 0, "per_doc": 2})
+    hits = _hits("docA_chunk0002", "docA_chunk0000", "docB_chunk0000", "docA_chunk0001", "docC_chunk0000")
+
+    results = prepare_hits(hits, store, settings)
+
+    assert _ids(results) == ["docA_chunk0002", "docA_chunk0000", "docB_chunk0000", "docC_chunk0000"]
+
+
+def test_per_doc_cap_not_binding_keeps_every_hit():
+    store = FakeStore(RECORDS)
+    hits = _hits("docA_chunk0002", "docA_chunk0000", "docA_chunk0001", "docB_chunk0000")
+
+    roomy = resolve_retrieval_settings({"neighbors": 0, "per_doc": 4})
+    undiversified = resolve_retrieval_settings({"neighbors": 0, "per_doc": 1, "diversify_per_doc": "false"})
+
+    assert _ids(prepare_hits(hits, store, roomy)) == _ids(hits)
+    assert _ids(prepare_hits(hits, store, undiversified)) == _ids(hits)
+
+
+def test_per_doc_cap_then_limit():
+    store = FakeStore(RECORDS)
+    settings = resolve_retrieval_settings({"neighbors": 0, "per_doc": 1})
+    hits = _hits("docA_chunk0000", "docA_chunk0001", "docB_chunk0000", "docC_chunk0000")
+
+    assert _ids(prepare_hits(hits, store, settings, limit=2)) == ["docA_chunk0000", "docB_chunk0000"]
+
+
+def test_prepare_hits_stitches_neighbours_into_preview():
+    store = FakeStore(RECORDS)
+    settings = resolve_retrieval_settings({"neighbors": 1, "per_doc": 0})
+
+    results = prepare_hits(_hits("docA_chunk0001"), store, settings)
+
+    meta = results[0]["metadata"]
+    assert meta["preview"] == (
+        "Irrigation scheduling trial. Soil moisture probes in irrigation. Yield results by irrigation block."
+    )
+    assert meta["max_snippet_chars"] == settings.max_snippet_chars
+    assert results[0]["cosine"] == results[0]["faiss_score"] == results[0]["score"]
+
+
+def _stitch_lookup():
+    return {
+        "doc_chunk0000": {"id": "doc_chunk0000", "doc_id": "doc", "text": "alpha\nbeta"},
+        "doc_chunk0001": {"id": "doc_chunk0001", "doc_id": "doc", "text": "  gamma\tdelta  "},
+        "doc_chunk0002": {"id": "doc_chunk0002", "doc_id": "doc", "text": "epsilon\r\nzeta"},
+        "other_chunk0000": {"id": "other_chunk0000", "doc_id": "other", "text": "unrelated"},
+    }
+
+
+def test_stitch_preview_budget_counts_separators():
+    lookup = _stitch_lookup()
+    center = lookup["doc_chunk0001"]
+    full = "alpha beta gamma delta epsilon  zeta"
+
+    assert stitch_preview(center, lookup, neighbors=1, max_chars=1000) == full
+    for max_chars in range(1, len(full) + 1):
+        preview = stitch_preview(center, lookup, neighbors=1, max_chars=max_chars)
+        assert len(preview) <= max_chars
+        assert full[:max_chars].startswith(preview)
+        # The baseline sliced the joined string; only a trailing separator may be dropped
+        assert preview == full[:max_chars] or preview == full[:max_chars].rstrip(" ")
+
+
+def test_stitch_preview_no_truncate_and_fallbacks():
+    lookup = _stitch_lookup()
+    center = lookup["doc_chunk0001"]
+
+    assert stitch_preview(center, lookup, neighbors=1, max_chars=5, no_truncate=True) == (
+        "alpha beta gamma delta epsilon  zeta"
+    )
+    # Only the same document's chunks are stitched
+    assert stitch_preview(lookup["other_chunk0000"], lookup, neighbors=1) == "unrelated"
+    # Nothing to stitch: centre text, whitespace-normalised and cut to budget
+    assert stitch_preview(center, {}, neighbors=1, max_chars=8) == "  gamma "
@@ -17,8 +17,8 @@ import statistics
 # Add project root to path
 sys.path.insert(0, str(Path(__file__).parent.parent.parent))
 
-from rag.segment.chunker import chunk_text, get_tokenizer
-from rag.segment.semantic_chunker import chunk_text_semantic
+from rag.ingest.chunkers.base import chunk_text, get_tokenizer
+from rag.ingest.chunkers.semantic import chunk_text_semantic
 
 
 def analyze_chunks(chunks: List[Dict], label: str) -> Dict: